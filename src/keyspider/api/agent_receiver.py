@@ -16,14 +16,14 @@ from keyspider.models.agent_status import AgentStatus
 from keyspider.models.server import Server
 from keyspider.models.ssh_key import SSHKey
 from keyspider.models.sudo_event import SudoEvent
-from keyspider.models.key_location import KeyLocation
 from keyspider.core.fingerprint import (
     calculate_sha256_fingerprint,
     calculate_md5_fingerprint,
     detect_key_type,
     extract_comment,
 )
-from keyspider.db.queries import get_or_create
+from keyspider.core.key_scanner import DiscoveredKey, store_discovered_keys
+from keyspider.db.queries import bulk_insert
 from keyspider.schemas.agent import (
     AgentEventsPayload,
     AgentHeartbeat,
@@ -105,32 +105,30 @@ async def agent_events(
         for ip, sid in result.all():
             ip_map[ip] = sid
 
+    now = datetime.now(timezone.utc)
     access_events = []
     for event in payload.events:
         try:
             event_time = datetime.fromisoformat(event.timestamp)
         except ValueError:
-            event_time = datetime.now(timezone.utc)
-
-        ssh_key_id = key_map.get(event.fingerprint) if event.fingerprint else None
-        source_server_id = ip_map.get(event.source_ip)
-
-        access_events.append(AccessEvent(
-            target_server_id=server_id,
-            source_ip=event.source_ip,
-            source_server_id=source_server_id,
-            ssh_key_id=ssh_key_id,
-            fingerprint=event.fingerprint,
-            username=event.username,
-            auth_method=event.auth_method,
-            event_type=event.event_type,
-            event_time=event_time,
-            raw_log_line=event.raw_line,
-            log_source="agent",
-        ))
-
-    db.add_all(access_events)
-    agent.last_event_at = datetime.now(timezone.utc)
+            event_time = now
+
+        access_events.append({
+            "target_server_id": server_id,
+            "source_ip": event.source_ip,
+            "source_server_id": ip_map.get(event.source_ip),
+            "ssh_key_id": key_map.get(event.fingerprint) if event.fingerprint else None,
+            "fingerprint": event.fingerprint,
+            "username": event.username,
+            "auth_method": event.auth_method,
+            "event_type": event.event_type,
+            "event_time": event_time,
+            "raw_log_line": event.raw_line,
+            "log_source": "agent",
+        })
+
+    await bulk_insert(db, AccessEvent, access_events)
+    agent.last_event_at = now
     await db.commit()
 
     return {"status": "ok", "events_received": len(access_events)}
@@ -145,27 +143,28 @@ async def agent_sudo_events(
     """Receive sudo events from an agent."""
     server_id = agent.server_id
 
+    now = datetime.now(timezone.utc)
     sudo_events = []
     for event in payload.events:
         try:
             event_time = datetime.fromisoformat(event.timestamp)
         except ValueError:
-            event_time = datetime.now(timezone.utc)
-
-        sudo_events.append(SudoEvent(
-            server_id=server_id,
-            username=event.username,
-            command=event.command,
-            target_user=event.target_user,
-            working_dir=event.working_dir,
-            tty=event.tty,
-            event_time=event_time,
-            success=event.success,
-            raw_log_line=event.raw_line,
-        ))
-
-    db.add_all(sudo_events)
-    agent.last_event_at = datetime.now(timezone.utc)
+            event_time = now
+
+        sudo_events.append({
+            "server_id": server_id,
+            "username": event.username,
+            "command": event.command,
+            "target_user": event.target_user,
+            "working_dir": event.working_dir,
+            "tty": event.tty,
+            "event_time": event_time,
+            "success": event.success,
+            "raw_log_line": event.raw_line,
+        })
+
+    await bulk_insert(db, SudoEvent, sudo_events)
+    agent.last_event_at = now
     await db.commit()
 
     return {"status": "ok", "events_received": len(sudo_events)}
@@ -178,31 +177,16 @@ async def agent_keys(
     db: AsyncSession = Depends(get_db),
 ):
     """Receive key inventory from an agent."""
-    server_id = agent.server_id
-    keys_stored = 0
-
+    keys = []
     for key_item in payload.keys:
         key_data = key_item.public_key_data.strip()
         if not key_data:
             continue
 
         fp_sha = calculate_sha256_fingerprint(key_data)
-        fp_md5 = calculate_md5_fingerprint(key_data)
         if not fp_sha:
             continue
 
-        ssh_key, _ = await get_or_create(
-            db, SSHKey,
-            defaults={
-                "fingerprint_md5": fp_md5,
-                "key_type": detect_key_type(key_data) or "unknown",
-                "public_key_data": key_data,
-                "comment": extract_comment(key_data),
-                "is_host_key": key_item.is_host_key,
-            },
-            fingerprint_sha256=fp_sha,
-        )
-
         # Parse mtime
         file_mtime = None
         if key_item.file_mtime:
@@ -211,29 +195,21 @@ async def agent_keys(
             except ValueError:
                 pass
 
-        if file_mtime:
-            if ssh_key.file_mtime is None or file_mtime < ssh_key.file_mtime:
-                ssh_key.file_mtime = file_mtime
-            if ssh_key.file_mtime:
-                ssh_key.estimated_age_days = (
-                    datetime.now(timezone.utc) - ssh_key.file_mtime
-                ).days
-
-        await get_or_create(
-            db, KeyLocation,
-            defaults={
-                "file_type": key_item.file_type,
-                "unix_owner": key_item.unix_owner,
-                "unix_permissions": key_item.unix_permissions,
-                "file_mtime": file_mtime,
-                "file_size": key_item.file_size,
-                "last_verified_at": datetime.now(timezone.utc),
-            },
-            ssh_key_id=ssh_key.id,
-            server_id=server_id,
+        keys.append(DiscoveredKey(
+            fingerprint_sha256=fp_sha,
+            fingerprint_md5=calculate_md5_fingerprint(key_data),
+            key_type=detect_key_type(key_data),
+            public_key_data=key_data,
+            comment=extract_comment(key_data),
             file_path=key_item.file_path,
-        )
-        keys_stored += 1
+            file_type=key_item.file_type,
+            unix_owner=key_item.unix_owner,
+            unix_permissions=key_item.unix_permissions,
+            is_host_key=key_item.is_host_key,
+            file_mtime=file_mtime,
+            file_size=key_item.file_size,
+        ))
 
+    keys_stored = await store_discovered_keys(db, agent.server_id, keys)
     await db.commit()
     return {"status": "ok", "keys_stored": keys_stored}
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy import select
 
+from keyspider.api.responses import list_response
 from keyspider.core.agent_manager import AgentManager
 from keyspider.core.ssh_connector import SSHConnectionPool
 from keyspider.db.queries import paginate
@@ -22,6 +24,8 @@ from keyspider.schemas.agent import (
 
 router = APIRouter()
 
+_SUDO_EVENTS_ADAPTER = TypeAdapter(list[SudoEventResponse])
+
 
 @router.get("", response_model=list[AgentStatusResponse])
 async def list_agents(db: DbSession, user: CurrentUser):
@@ -124,4 +128,4 @@ async def get_sudo_events(
         .order_by(SudoEvent.event_time.desc())
     )
     items, total = await paginate(db, stmt, offset, limit)
-    return SudoEventListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_SUDO_EVENTS_ADAPTER, items, total, offset, limit)
@@ -12,7 +12,7 @@ from sqlalchemy import select
 
 from keyspider.config import settings
 from keyspider.dependencies import AdminUser, CurrentUser, DbSession
-from keyspider.models.api_key import APIKey
+from keyspider.models.api_key import API_KEY_PREFIX_LENGTH, APIKey, hash_api_key
 from keyspider.models.user import User
 from keyspider.schemas.auth import (
     APIKeyCreate,
@@ -58,8 +58,9 @@ async def logout(user: CurrentUser):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(user: CurrentUser):
-    return user
+async def get_me(db: DbSession, user: CurrentUser):
+    result = await db.execute(select(User).where(User.id == user.id))
+    return result.scalar_one()
 
 
 @router.post("/users", response_model=UserResponse)
@@ -84,8 +85,8 @@ async def create_user(request: UserCreate, db: DbSession, admin: AdminUser):
 @router.post("/api-keys", response_model=APIKeyCreated)
 async def create_api_key(request: APIKeyCreate, db: DbSession, user: CurrentUser):
     raw_key = secrets.token_urlsafe(48)
-    key_hash = bcrypt.hash(raw_key)
-    key_prefix = raw_key[:8]
+    key_hash = hash_api_key(raw_key)
+    key_prefix = raw_key[:API_KEY_PREFIX_LENGTH]
 
     expires_at = None
     if request.expires_in_days:
@@ -96,7 +97,7 @@ async def create_api_key(request: APIKeyCreate, db: DbSession, user: CurrentUser
         key_hash=key_hash,
         key_prefix=key_prefix,
         name=request.name,
-        permissions=request.permissions,
+        permissions=list(request.permissions),
         expires_at=expires_at,
     )
     db.add(api_key)
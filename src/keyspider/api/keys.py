@@ -3,15 +3,18 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy import func, select
+from sqlalchemy.orm import undefer
 
+from keyspider.api.responses import list_response
 from keyspider.db.queries import paginate
 from keyspider.dependencies import CurrentUser, DbSession
 from keyspider.models.access_event import AccessEvent
 from keyspider.models.key_location import KeyLocation
 from keyspider.models.server import Server
 from keyspider.models.ssh_key import SSHKey
-from keyspider.schemas.access_event import AccessEventListResponse
+from keyspider.schemas.access_event import AccessEventListResponse, AccessEventResponse
 from keyspider.schemas.ssh_key import (
     KeyLocationResponse,
     SSHKeyDetail,
@@ -21,6 +24,9 @@ from keyspider.schemas.ssh_key import (
 
 router = APIRouter()
 
+_KEYS_ADAPTER = TypeAdapter(list[SSHKeyResponse])
+_ACCESS_EVENTS_ADAPTER = TypeAdapter(list[AccessEventResponse])
+
 
 @router.get("", response_model=SSHKeyListResponse)
 async def list_keys(
@@ -44,12 +50,14 @@ async def list_keys(
         )
     stmt = stmt.order_by(SSHKey.created_at.desc())
     items, total = await paginate(db, stmt, offset, limit)
-    return SSHKeyListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_KEYS_ADAPTER, items, total, offset, limit)
 
 
 @router.get("/{key_id}", response_model=SSHKeyDetail)
 async def get_key(key_id: int, db: DbSession, user: CurrentUser):
-    result = await db.execute(select(SSHKey).where(SSHKey.id == key_id))
+    result = await db.execute(
+        select(SSHKey).options(undefer(SSHKey.public_key_data)).where(SSHKey.id == key_id)
+    )
     key = result.scalar_one_or_none()
     if not key:
         raise HTTPException(status_code=404, detail="Key not found")
@@ -116,7 +124,7 @@ async def get_key_events(
         .order_by(AccessEvent.event_time.desc())
     )
     items, total = await paginate(db, stmt, offset, limit)
-    return AccessEventListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_ACCESS_EVENTS_ADAPTER, items, total, offset, limit)
 
 
 @router.get("/by-fingerprint/{fingerprint:path}", response_model=SSHKeyResponse)
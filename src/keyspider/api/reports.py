@@ -5,8 +5,10 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy import func, select
 
+from keyspider.api.responses import list_response
 from keyspider.db.queries import paginate
 from keyspider.dependencies import CurrentUser, DbSession, OperatorUser
 from keyspider.models.access_event import AccessEvent
@@ -30,6 +32,8 @@ from keyspider.schemas.report import (
 
 router = APIRouter()
 
+_UNREACHABLE_ADAPTER = TypeAdapter(list[UnreachableSourceResponse])
+
 
 @router.get("/unreachable", response_model=UnreachableListResponse)
 async def get_unreachable_sources(
@@ -49,7 +53,7 @@ async def get_unreachable_sources(
         stmt = stmt.where(UnreachableSource.acknowledged == acknowledged)
 
     items, total = await paginate(db, stmt, offset, limit)
-    return UnreachableListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_UNREACHABLE_ADAPTER, items, total, offset, limit)
 
 
 @router.get("/key-exposure", response_model=list[KeyExposureItem])
@@ -314,7 +318,7 @@ async def list_alerts(
         stmt = stmt.where(UnreachableSource.severity == severity)
 
     items, total = await paginate(db, stmt, offset, limit)
-    return UnreachableListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_UNREACHABLE_ADAPTER, items, total, offset, limit)
 
 
 @router.put("/alerts/{alert_id}/acknowledge")
@@ -0,0 +1,29 @@
+"""Response helpers shared by list endpoints."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def list_response(
+    adapter: TypeAdapter,
+    items: Sequence[Any],
+    total: int,
+    offset: int | None = None,
+    limit: int | None = None,
+) -> Response:
+    """Serialize a list envelope without building the wrapper model.
+
+    The rows are validated and dumped in one pass by ``adapter`` and the
+    envelope is composed around the resulting bytes, so FastAPI does not
+    validate the page a second time against the route's response_model.
+    """
+    body = b'{"items":' + adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+    body += b',"total":%d' % total
+    if offset is not None:
+        body += b',"offset":%d,"limit":%d' % (offset, limit)
+    return Response(content=body + b"}", media_type="application/json")
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy import select
 
+from keyspider.api.responses import list_response
 from keyspider.db.queries import paginate
 from keyspider.dependencies import CurrentUser, DbSession, OperatorUser
 from keyspider.models.scan_job import ScanJob
@@ -14,6 +16,8 @@ from keyspider.workers.spider_tasks import spider_crawl
 
 router = APIRouter()
 
+_SCANS_ADAPTER = TypeAdapter(list[ScanResponse])
+
 
 @router.post("", response_model=ScanResponse, status_code=201)
 async def create_scan(request: ScanCreate, db: DbSession, user: OperatorUser):
@@ -61,7 +65,7 @@ async def list_scans(
     if status:
         stmt = stmt.where(ScanJob.status == status)
     items, total = await paginate(db, stmt, offset, limit)
-    return ScanListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_SCANS_ADAPTER, items, total, offset, limit)
 
 
 @router.get("/{job_id}", response_model=ScanResponse)
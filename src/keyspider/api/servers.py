@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy import select
 
+from keyspider.api.responses import list_response
 from keyspider.db.queries import paginate
 from keyspider.dependencies import CurrentUser, DbSession, OperatorUser
 from keyspider.models.access_event import AccessEvent
@@ -24,6 +26,9 @@ from keyspider.schemas.ssh_key import KeyLocationResponse
 
 router = APIRouter()
 
+_SERVERS_ADAPTER = TypeAdapter(list[ServerResponse])
+_ACCESS_EVENTS_ADAPTER = TypeAdapter(list[AccessEventResponse])
+
 
 @router.get("", response_model=ServerListResponse)
 async def list_servers(
@@ -47,7 +52,7 @@ async def list_servers(
 
     stmt = stmt.order_by(Server.hostname)
     items, total = await paginate(db, stmt, offset, limit)
-    return ServerListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_SERVERS_ADAPTER, items, total, offset, limit)
 
 
 @router.post("", response_model=ServerResponse, status_code=201)
@@ -145,7 +150,7 @@ async def get_server_events(
         .order_by(AccessEvent.event_time.desc())
     )
     items, total = await paginate(db, stmt, offset, limit)
-    return AccessEventListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_ACCESS_EVENTS_ADAPTER, items, total, offset, limit)
 
 
 @router.get("/{server_id}/access-paths", response_model=list[AccessPathResponse])
@@ -5,19 +5,24 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy import select
 
+from keyspider.api.responses import list_response
 from keyspider.db.queries import paginate
 from keyspider.dependencies import CurrentUser, DbSession, OperatorUser
 from keyspider.models.access_event import AccessEvent
 from keyspider.models.server import Server
 from keyspider.models.watch_session import WatchSession
-from keyspider.schemas.access_event import AccessEventListResponse
+from keyspider.schemas.access_event import AccessEventListResponse, AccessEventResponse
 from keyspider.schemas.watch import WatchCreate, WatchListResponse, WatchResponse
 from keyspider.workers.watch_tasks import start_watcher, stop_watcher
 
 router = APIRouter()
 
+_WATCHES_ADAPTER = TypeAdapter(list[WatchResponse])
+_ACCESS_EVENTS_ADAPTER = TypeAdapter(list[AccessEventResponse])
+
 
 @router.post("", response_model=WatchResponse, status_code=201)
 async def create_watch(request: WatchCreate, db: DbSession, user: OperatorUser):
@@ -58,7 +63,7 @@ async def list_watches(db: DbSession, user: CurrentUser):
         select(WatchSession).order_by(WatchSession.started_at.desc())
     )
     items = result.scalars().all()
-    return WatchListResponse(items=items, total=len(items))
+    return list_response(_WATCHES_ADAPTER, items, len(items))
 
 
 @router.get("/{session_id}", response_model=WatchResponse)
@@ -152,4 +157,4 @@ async def get_watch_events(
         )
 
     items, total = await paginate(db, stmt, offset, limit)
-    return AccessEventListResponse(items=items, total=total, offset=offset, limit=limit)
+    return list_response(_ACCESS_EVENTS_ADAPTER, items, total, offset, limit)
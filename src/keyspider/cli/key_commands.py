@@ -8,6 +8,7 @@ import typer
 from rich.console import Console
 from rich.table import Table
 from sqlalchemy import select
+from sqlalchemy.orm import undefer
 
 from keyspider.db.session import async_session_factory
 from keyspider.models.key_location import KeyLocation
@@ -76,7 +77,9 @@ def show_key(
 async def _show_key(fingerprint: str):
     async with async_session_factory() as session:
         result = await session.execute(
-            select(SSHKey).where(SSHKey.fingerprint_sha256 == fingerprint)
+            select(SSHKey)
+            .options(undefer(SSHKey.public_key_data))
+            .where(SSHKey.fingerprint_sha256 == fingerprint)
         )
         key = result.scalar_one_or_none()
 
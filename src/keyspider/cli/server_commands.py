@@ -11,6 +11,7 @@ from rich.console import Console
 from rich.table import Table
 from sqlalchemy import select
 
+from keyspider.db.queries import find_server_by_host
 from keyspider.db.session import async_session_factory
 from keyspider.models.server import Server
 
@@ -122,12 +123,7 @@ def show_server(
 
 async def _show_server(host: str):
     async with async_session_factory() as session:
-        result = await session.execute(
-            select(Server).where(
-                (Server.hostname == host) | (Server.ip_address == host)
-            )
-        )
-        server = result.scalar_one_or_none()
+        server = await find_server_by_host(session, host)
 
     if not server:
         console.print(f"[red]Server not found: {host}[/red]")
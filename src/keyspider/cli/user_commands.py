@@ -11,7 +11,7 @@ from rich.console import Console
 from sqlalchemy import select
 
 from keyspider.db.session import async_session_factory
-from keyspider.models.api_key import APIKey
+from keyspider.models.api_key import API_KEY_PREFIX_LENGTH, APIKey, hash_api_key
 from keyspider.models.user import User
 
 console = Console()
@@ -63,12 +63,12 @@ async def _create_apikey(name: str, username: str):
             raise typer.Exit(1)
 
         raw_key = secrets.token_urlsafe(48)
-        key_hash = bcrypt.hash(raw_key)
+        key_hash = hash_api_key(raw_key)
 
         api_key = APIKey(
             user_id=user.id,
             key_hash=key_hash,
-            key_prefix=raw_key[:8],
+            key_prefix=raw_key[:API_KEY_PREFIX_LENGTH],
             name=name,
             permissions=["read", "write"],
         )
@@ -9,6 +9,7 @@ from rich.console import Console
 from rich.table import Table
 from sqlalchemy import select
 
+from keyspider.db.queries import find_server_by_host
 from keyspider.db.session import async_session_factory
 from keyspider.models.server import Server
 from keyspider.models.watch_session import WatchSession
@@ -30,12 +31,7 @@ def watch_start(
 
 async def _watch_start(host: str, depth: int, auto_spider: bool):
     async with async_session_factory() as session:
-        result = await session.execute(
-            select(Server).where(
-                (Server.hostname == host) | (Server.ip_address == host)
-            )
-        )
-        server = result.scalar_one_or_none()
+        server = await find_server_by_host(session, host)
         if not server:
             console.print(f"[red]Server not found: {host}[/red]")
             raise typer.Exit(1)
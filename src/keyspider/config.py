@@ -27,10 +27,16 @@ class Settings(BaseSettings):
     ssh_max_connections: int = 50
     ssh_per_server_limit: int = 3
 
+    # SFTP reads, in multiples of the 30000-byte minimum SFTP packet every server accepts
+    sftp_block_size: int = 60000
+    sftp_max_requests: int = 128
+
     # Auth
     secret_key: str = "change-me-in-production"
     access_token_expire_minutes: int = 60
     algorithm: str = "HS256"
+    api_key_pepper: str = "change-me-in-production"
+    api_key_usage_flush_interval: int = 10  # seconds
 
     # CORS
     cors_origins: list[str] = ["http://localhost:3000"]
@@ -46,6 +52,10 @@ class Settings(BaseSettings):
     spider_default_depth: int = 10
     spider_max_depth: int = 50
 
+    # Scanning
+    scan_inline_max_servers: int = 50  # scheduled scans of this many servers or fewer skip the broker
+    scan_concurrency: int = 10
+
     # Log scanning
     log_max_lines_initial: int = 50000
     log_max_lines_incremental: int = 50000
@@ -143,15 +143,18 @@ class AgentManager:
         server.prefer_agent = False
         await session.commit()
 
-    async def check_health(self, session: AsyncSession, server_id: int) -> bool:
-        """Check if agent is healthy (heartbeat within 5 minutes)."""
+    async def check_health(
+        self, session: AsyncSession, server_id: int, now: datetime | None = None
+    ) -> bool:
+        """Check if agent is healthy (heartbeat within 5 minutes of ``now``)."""
         result = await session.execute(
             select(AgentStatus).where(AgentStatus.server_id == server_id)
         )
         agent = result.scalar_one_or_none()
         if not agent or not agent.last_heartbeat_at:
             return False
-        age = (datetime.now(timezone.utc) - agent.last_heartbeat_at).total_seconds()
+        now = now or datetime.now(timezone.utc)
+        age = (now - agent.last_heartbeat_at).total_seconds()
         return age < 300
 
     async def deploy_to_many(
@@ -7,6 +7,7 @@ from collections import defaultdict, deque
 
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from keyspider.models.access_path import AccessPath
 from keyspider.models.server import Server
@@ -33,14 +34,22 @@ class GraphBuilder:
         result = await self.session.execute(select(Server))
         servers = result.scalars().all()
 
-        # Get all active access paths with optional layer filter
-        stmt = select(AccessPath).where(AccessPath.is_active.is_(True))
+        # Get all active access paths with optional layer filter, along with
+        # each path's key type in the same query. Edges are built from columns
+        # only, so any relationship access is a bug and raises instead of
+        # issuing one lazy query per path.
+        stmt = (
+            select(AccessPath, SSHKey.key_type)
+            .outerjoin(SSHKey, SSHKey.id == AccessPath.ssh_key_id)
+            .where(AccessPath.is_active.is_(True))
+            .options(raiseload("*"))
+        )
         if layer == "authorization":
             stmt = stmt.where(AccessPath.is_authorized.is_(True))
         elif layer == "usage":
             stmt = stmt.where(AccessPath.is_used.is_(True))
         result = await self.session.execute(stmt)
-        paths = result.scalars().all()
+        paths = result.all()
 
         # Get unreachable sources
         result = await self.session.execute(
@@ -85,7 +94,7 @@ class GraphBuilder:
             ))
 
         # Add access path edges
-        for path in paths:
+        for path, key_type in paths:
             if path.source_server_id:
                 source = f"server-{path.source_server_id}"
             else:
@@ -94,14 +103,6 @@ class GraphBuilder:
             target = f"server-{path.target_server_id}"
             edge_id = f"path-{path.id}"
 
-            # Get key type if available
-            key_type = None
-            if path.ssh_key_id:
-                result = await self.session.execute(
-                    select(SSHKey.key_type).where(SSHKey.id == path.ssh_key_id)
-                )
-                key_type = result.scalar_one_or_none()
-
             edges.append(GraphEdge(
                 id=edge_id,
                 source=source,
@@ -136,7 +137,11 @@ class GraphBuilder:
             show_dormant: Include authorized but never used paths
             show_mystery: Include used but not authorized paths
         """
-        stmt = select(AccessPath).where(AccessPath.is_active.is_(True))
+        stmt = (
+            select(AccessPath)
+            .where(AccessPath.is_active.is_(True))
+            .options(raiseload("*"))
+        )
 
         if layer == "authorization":
             stmt = stmt.where(AccessPath.is_authorized.is_(True))
@@ -5,9 +5,11 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 
 import asyncssh
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from keyspider.core.fingerprint import (
     calculate_md5_fingerprint,
@@ -15,12 +17,20 @@ from keyspider.core.fingerprint import (
     detect_key_type,
     extract_comment,
 )
-from keyspider.core.sftp_reader import SFTPReader
+from keyspider.core.sftp_reader import FileInfo, SFTPReader
+from keyspider.db.queries import dialect_insert, staged_execute
+from keyspider.models.key_location import KeyLocation
+from keyspider.models.ssh_key import SSHKey
 
 logger = logging.getLogger(__name__)
 
+# Candidate file names looked for in each user's ~/.ssh
+_AUTHORIZED_KEYS_NAMES = ("authorized_keys", "authorized_keys2")
+_IDENTITY_PUB_NAMES = ("id_rsa.pub", "id_ed25519.pub", "id_ecdsa.pub", "id_dsa.pub")
+_PRIVATE_KEY_NAMES = ("id_rsa", "id_ed25519", "id_ecdsa", "id_dsa")
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class DiscoveredKey:
     """A key discovered on a remote server."""
 
@@ -100,26 +110,44 @@ async def _scan_user_ssh_dir(
     keys: list[DiscoveredKey] = []
     ssh_dir = f"{home_dir}/.ssh"
 
+    # One listing tells us which candidates exist and carries their metadata,
+    # so absent files cost no round trips
+    entries: dict[str, FileInfo | None] | None = await SFTPReader.list_dir_with_stat(
+        conn, ssh_dir
+    )
+    if entries is None:
+        # Unlistable (e.g. an exec-only 0711 .ssh) or missing directory: probe
+        # every candidate by path; the helpers stat each one themselves
+        entries = dict.fromkeys(
+            _AUTHORIZED_KEYS_NAMES + _IDENTITY_PUB_NAMES + _PRIVATE_KEY_NAMES
+        )
+
     # Check authorized_keys
-    for ak_path in [f"{ssh_dir}/authorized_keys", f"{ssh_dir}/authorized_keys2"]:
-        ak_keys = await _parse_authorized_keys(conn, ak_path, username)
-        keys.extend(ak_keys)
+    for name in _AUTHORIZED_KEYS_NAMES:
+        if name in entries:
+            ak_keys = await _parse_authorized_keys(
+                conn, f"{ssh_dir}/{name}", username, entries[name]
+            )
+            keys.extend(ak_keys)
 
     # Check identity files (public keys)
-    identity_patterns = ["id_rsa.pub", "id_ed25519.pub", "id_ecdsa.pub", "id_dsa.pub"]
-    for pattern in identity_patterns:
-        pub_path = f"{ssh_dir}/{pattern}"
-        pub_key = await _read_public_key_file(conn, pub_path, username)
-        if pub_key:
-            keys.append(pub_key)
+    for pattern in _IDENTITY_PUB_NAMES:
+        if pattern in entries:
+            pub_key = await _read_public_key_file(
+                conn, f"{ssh_dir}/{pattern}", username, entries[pattern]
+            )
+            if pub_key:
+                keys.append(pub_key)
 
     # Check for private keys (we only record metadata, never content)
-    priv_patterns = ["id_rsa", "id_ed25519", "id_ecdsa", "id_dsa"]
-    for pattern in priv_patterns:
-        priv_path = f"{ssh_dir}/{pattern}"
-        priv_meta = await _check_private_key(conn, priv_path, username)
-        if priv_meta:
-            keys.append(priv_meta)
+    for pattern in _PRIVATE_KEY_NAMES:
+        if pattern in entries:
+            priv_meta = await _check_private_key(
+                conn, f"{ssh_dir}/{pattern}", username, entries[pattern],
+                pub_exists=f"{pattern}.pub" in entries,
+            )
+            if priv_meta:
+                keys.append(priv_meta)
 
     return keys
 
@@ -128,6 +156,7 @@ async def _parse_authorized_keys(
     conn: asyncssh.SSHClientConnection,
     file_path: str,
     owner: str,
+    file_info: FileInfo | None = None,
 ) -> list[DiscoveredKey]:
     """Parse an authorized_keys file for public keys."""
     keys: list[DiscoveredKey] = []
@@ -136,7 +165,8 @@ async def _parse_authorized_keys(
         if content is None:
             return []
 
-        file_info = await SFTPReader.stat_file(conn, file_path)
+        if file_info is None:
+            file_info = await SFTPReader.stat_file(conn, file_path)
         perms = file_info.permissions if file_info else None
         mtime = file_info.mtime if file_info else None
         size = file_info.size if file_info else None
@@ -179,6 +209,7 @@ async def _read_public_key_file(
     conn: asyncssh.SSHClientConnection,
     file_path: str,
     owner: str,
+    file_info: FileInfo | None = None,
 ) -> DiscoveredKey | None:
     """Read a single public key file."""
     try:
@@ -190,7 +221,8 @@ async def _read_public_key_file(
         if not key_data:
             return None
 
-        file_info = await SFTPReader.stat_file(conn, file_path)
+        if file_info is None:
+            file_info = await SFTPReader.stat_file(conn, file_path)
         perms = file_info.permissions if file_info else None
         mtime = file_info.mtime if file_info else None
         size = file_info.size if file_info else None
@@ -223,6 +255,8 @@ async def _check_private_key(
     conn: asyncssh.SSHClientConnection,
     file_path: str,
     owner: str,
+    file_info: FileInfo | None = None,
+    pub_exists: bool = True,
 ) -> DiscoveredKey | None:
     """Check if a private key file exists and get its metadata.
 
@@ -230,7 +264,8 @@ async def _check_private_key(
     We derive the fingerprint from the corresponding .pub file.
     """
     try:
-        file_info = await SFTPReader.stat_file(conn, file_path)
+        if file_info is None:
+            file_info = await SFTPReader.stat_file(conn, file_path)
         if file_info is None:
             return None
 
@@ -239,8 +274,9 @@ async def _check_private_key(
         size = file_info.size
 
         # Try to get fingerprint from the corresponding public key file
-        pub_path = f"{file_path}.pub"
-        pub_content = await SFTPReader.read_file(conn, pub_path)
+        pub_content = None
+        if pub_exists:
+            pub_content = await SFTPReader.read_file(conn, f"{file_path}.pub")
         fp_sha = None
         fp_md5 = None
         key_type = None
@@ -321,15 +357,133 @@ async def _scan_host_keys(
     return keys
 
 
+# Key type tokens that begin the key part of an authorized_keys line
+_KEY_TYPE_PREFIXES = ("ssh-rsa", "ssh-ed25519", "ssh-dss", "ecdsa-sha2-nistp")
+
+
 def _strip_authorized_keys_options(line: str) -> str | None:
     """Strip options prefix from an authorized_keys line.
 
     authorized_keys lines can have options before the key type:
     command="...",no-pty ssh-rsa AAAA... comment
     """
-    key_types = ("ssh-rsa", "ssh-ed25519", "ssh-dss", "ecdsa-sha2-nistp")
-    for kt in key_types:
-        idx = line.find(kt)
-        if idx >= 0:
-            return line[idx:]
+    # Single pass over the line: options may contain quoted spaces (and even
+    # key type names inside a quoted command), so only unquoted tokens count.
+    in_quotes = False
+    start = 0
+    for i, c in enumerate(line):
+        if c == '"':
+            in_quotes = not in_quotes
+        elif c in " \t" and not in_quotes:
+            if line.startswith(_KEY_TYPE_PREFIXES, start, i):
+                return line[start:]
+            start = i + 1
+    if line.startswith(_KEY_TYPE_PREFIXES, start):
+        return line[start:]
     return None
+
+
+async def store_discovered_keys(
+    session: AsyncSession,
+    server_id: int,
+    keys: list[DiscoveredKey],
+    now: datetime | None = None,
+) -> int:
+    """Store discovered keys and their locations on a server in bulk.
+
+    Existing keys are loaded with one query, new keys are inserted with
+    ON CONFLICT DO NOTHING in one statement, and all locations are upserted
+    in one statement.
+    ``now`` stamps last_verified_at and key ages; it defaults to the current time.
+    Returns the number of discovered keys stored.
+    """
+    keys = [dk for dk in keys if dk.fingerprint_sha256]
+    if not keys:
+        return 0
+    now = now or datetime.now(timezone.utc)
+
+    # First occurrence and oldest file mtime per fingerprint
+    first_seen: dict[str, DiscoveredKey] = {}
+    oldest_mtime: dict[str, datetime] = {}
+    for dk in keys:
+        fp = dk.fingerprint_sha256
+        first_seen.setdefault(fp, dk)
+        if dk.file_mtime and (fp not in oldest_mtime or dk.file_mtime < oldest_mtime[fp]):
+            oldest_mtime[fp] = dk.file_mtime
+
+    result = await session.execute(
+        select(SSHKey).where(SSHKey.fingerprint_sha256.in_(first_seen))
+    )
+    key_ids: dict[str, int] = {}
+    for ssh_key in result.scalars():
+        key_ids[ssh_key.fingerprint_sha256] = ssh_key.id
+        mtime = oldest_mtime.get(ssh_key.fingerprint_sha256)
+        if mtime:
+            if ssh_key.file_mtime is None or mtime < ssh_key.file_mtime:
+                ssh_key.file_mtime = mtime
+            ssh_key.estimated_age_days = (now - ssh_key.file_mtime).days
+
+    new_keys = [
+        {
+            "fingerprint_sha256": fp,
+            "fingerprint_md5": dk.fingerprint_md5,
+            "key_type": dk.key_type or "unknown",
+            "public_key_data": dk.public_key_data,
+            "comment": dk.comment,
+            "is_host_key": dk.is_host_key,
+            "file_mtime": oldest_mtime.get(fp),
+            "estimated_age_days": (now - oldest_mtime[fp]).days if fp in oldest_mtime else None,
+        }
+        for fp, dk in first_seen.items()
+        if fp not in key_ids
+    ]
+    if new_keys:
+        # Another worker may insert the same key concurrently; let the unique
+        # index arbitrate and pick up ids for any rows that lost the race.
+        result = await staged_execute(
+            session,
+            dialect_insert(session, SSHKey)
+            .on_conflict_do_nothing(index_elements=["fingerprint_sha256"])
+            .returning(SSHKey.fingerprint_sha256, SSHKey.id),
+            new_keys,
+        )
+        key_ids.update(result.all())
+
+        missing = [k["fingerprint_sha256"] for k in new_keys if k["fingerprint_sha256"] not in key_ids]
+        if missing:
+            result = await session.execute(
+                select(SSHKey.fingerprint_sha256, SSHKey.id).where(
+                    SSHKey.fingerprint_sha256.in_(missing)
+                )
+            )
+            key_ids.update(result.all())
+
+    # One row per (key, path); the last occurrence wins like a repeated upsert
+    locations = {
+        (dk.fingerprint_sha256, dk.file_path): {
+            "ssh_key_id": key_ids[dk.fingerprint_sha256],
+            "server_id": server_id,
+            "file_path": dk.file_path,
+            "file_type": dk.file_type,
+            "unix_owner": dk.unix_owner,
+            "unix_permissions": dk.unix_permissions,
+            "file_mtime": dk.file_mtime,
+            "file_size": dk.file_size,
+            "last_verified_at": now,
+        }
+        for dk in keys
+    }
+    stmt = dialect_insert(session, KeyLocation)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ssh_key_id", "server_id", "file_path"],
+        set_={
+            col: stmt.excluded[col]
+            for col in (
+                "file_type", "unix_owner", "unix_permissions",
+                "file_mtime", "file_size", "last_verified_at",
+            )
+        },
+    )
+    await staged_execute(session, stmt, list(locations.values()))
+
+    return len(keys)
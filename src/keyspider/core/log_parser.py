@@ -5,11 +5,19 @@ from __future__ import annotations
 import json
 import re
 import logging
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
+try:
+    import orjson
+except ImportError:  # optional; the stdlib parser handles the same input
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 
 @dataclass
 class AuthEvent:
@@ -102,16 +110,34 @@ _AIX_FAILED_RE = re.compile(
     r"(?:\s+ssh2:\s+\S+\s+(?P<fingerprint>\S+))?"
 )
 
-# Sudo log regex
-_SUDO_RE = re.compile(
+# parse_line picks the one pattern that can match a line from the first word
+# of its sshd message, with the event type that pattern yields
+_LINUX_PATTERNS: dict[str, tuple[re.Pattern, str]] = {
+    "Accepted": (_ACCEPTED_KEY_RE, "accepted"),
+    "Failed": (_FAILED_RE, "failed"),
+    "Invalid": (_INVALID_USER_RE, "invalid_user"),
+    "Disconnected": (_DISCONNECT_RE, "disconnected"),
+}
+_AIX_PATTERNS: dict[str, tuple[re.Pattern, str]] = {
+    "Accepted": (_AIX_ACCEPTED_RE, "accepted"),
+    "Failed": (_AIX_FAILED_RE, "failed"),
+}
+
+# Syslog month abbreviations, looked up lowercased as strptime's %b is case-insensitive
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+    )
+}
+
+# Sudo log prefix up to the invoking user; the " ; "-separated fields that
+# follow are split with str methods in parse_sudo_line
+_SUDO_PREFIX_RE = re.compile(
     r"(?P<timestamp>\w+\s+\d+\s+[\d:]+)\s+"
     r"(?P<hostname>\S+)\s+"
     r"sudo(?:\[\d+\])?:\s+"
     r"(?P<username>\S+)\s+:\s+"
-    r"TTY=(?P<tty>\S+)\s+;\s+"
-    r"PWD=(?P<pwd>\S+)\s+;\s+"
-    r"USER=(?P<target_user>\S+)\s+;\s+"
-    r"COMMAND=(?P<command>.+)"
 )
 
 
@@ -130,20 +156,21 @@ def _parse_syslog_timestamp(
     if reference_time:
         year = reference_time.year
 
-    # Normalize whitespace (syslog uses double space for single-digit days)
-    ts_str = re.sub(r"\s+", " ", ts_str.strip())
+    # split() also absorbs the double space syslog uses for single-digit days
     try:
-        dt = datetime.strptime(f"{year} {ts_str}", "%Y %b %d %H:%M:%S")
-        dt = dt.replace(tzinfo=timezone.utc)
+        month, day, clock = ts_str.split()
+        hour, minute, second = clock.split(":")
+        dt = datetime(
+            year, _MONTHS[month.lower()], int(day),
+            int(hour), int(minute), int(second), tzinfo=timezone.utc,
+        )
 
         # Year rollover detection
         if last_timestamp and (last_timestamp - dt).days > 300:
-            year -= 1
-            dt = datetime.strptime(f"{year} {ts_str}", "%Y %b %d %H:%M:%S")
-            dt = dt.replace(tzinfo=timezone.utc)
+            dt = dt.replace(year=year - 1)
 
         return dt
-    except ValueError:
+    except (KeyError, ValueError):
         return datetime.now(timezone.utc)
 
 
@@ -155,42 +182,41 @@ def parse_line(
 ) -> AuthEvent | None:
     """Parse a single log line into an AuthEvent, or None if not an SSH event."""
     line = line.strip()
-    if not line or "sshd[" not in line:
+    start = line.find("sshd[")
+    if start < 0:
+        return None
+    end = line.find("]:", start)
+    if end < 0:
         return None
 
-    patterns: list[tuple[re.Pattern, str]]
-    if os_type == "aix":
-        patterns = [
-            (_AIX_ACCEPTED_RE, "accepted"),
-            (_AIX_FAILED_RE, "failed"),
-        ]
-    else:
-        patterns = [
-            (_ACCEPTED_KEY_RE, "accepted"),
-            (_FAILED_RE, "failed"),
-            (_INVALID_USER_RE, "invalid_user"),
-            (_DISCONNECT_RE, "disconnected"),
-        ]
-
-    for pattern, event_type in patterns:
-        m = pattern.match(line)
-        if m:
-            groups = m.groupdict()
-            return AuthEvent(
-                timestamp=_parse_syslog_timestamp(
-                    groups["timestamp"], reference_time, last_timestamp
-                ),
-                source_ip=groups["ip"],
-                username=groups.get("username", "unknown"),
-                auth_method=groups.get("method"),
-                event_type=event_type,
-                fingerprint=groups.get("fingerprint"),
-                port=int(groups["port"]) if groups.get("port") else None,
-                pid=int(groups["pid"]) if groups.get("pid") else None,
-                raw_line=line,
-            )
+    # Only the pattern for the message's first word can match; split on any
+    # whitespace like the patterns' \s+
+    words = line[end + 2:].split(None, 1)
+    if not words:
+        return None
+    patterns = _AIX_PATTERNS if os_type == "aix" else _LINUX_PATTERNS
+    entry = patterns.get(words[0])
+    if entry is None:
+        return None
+    pattern, event_type = entry
+    m = pattern.match(line)
+    if not m:
+        return None
 
-    return None
+    groups = m.groupdict()
+    return AuthEvent(
+        timestamp=_parse_syslog_timestamp(
+            groups["timestamp"], reference_time, last_timestamp
+        ),
+        source_ip=groups["ip"],
+        username=groups.get("username", "unknown"),
+        auth_method=groups.get("method"),
+        event_type=event_type,
+        fingerprint=groups.get("fingerprint"),
+        port=int(groups["port"]) if groups.get("port") else None,
+        pid=int(groups["pid"]) if groups.get("pid") else None,
+        raw_line=line,
+    )
 
 
 def parse_log(
@@ -199,14 +225,21 @@ def parse_log(
     reference_time: datetime | None = None,
 ) -> list[AuthEvent]:
     """Parse an entire log file content into a list of AuthEvents."""
-    events = []
+    return list(parse_log_lines(content.splitlines(), os_type, reference_time))
+
+
+def parse_log_lines(
+    lines: Iterable[str],
+    os_type: str = "linux",
+    reference_time: datetime | None = None,
+) -> Iterator[AuthEvent]:
+    """Lazily parse log lines into AuthEvents."""
     last_ts: datetime | None = None
-    for line in content.splitlines():
+    for line in lines:
         event = parse_line(line, os_type, reference_time, last_ts)
         if event:
             last_ts = event.timestamp
-            events.append(event)
-    return events
+            yield event
 
 
 @dataclass
@@ -229,32 +262,54 @@ def parse_sudo_line(
     last_timestamp: datetime | None = None,
 ) -> SudoLogEvent | None:
     """Parse a single sudo log line."""
+    # Every sudo command entry carries COMMAND=; the pam_unix(sudo:session)
+    # lines logged alongside them do not, so this rejects those too.
+    if "COMMAND=" not in line:
+        return None
+
     line = line.strip()
-    if not line or "sudo" not in line:
+    m = _SUDO_PREFIX_RE.match(line)
+    if not m:
         return None
 
-    m = _SUDO_RE.match(line)
-    if m:
-        groups = m.groupdict()
-        return SudoLogEvent(
-            timestamp=_parse_syslog_timestamp(
-                groups["timestamp"], reference_time, last_timestamp
-            ),
-            username=groups["username"],
-            tty=groups["tty"],
-            working_dir=groups["pwd"],
-            target_user=groups["target_user"],
-            command=groups["command"].strip(),
-            raw_line=line,
-        )
-    return None
+    timestamp, _hostname, username = m.groups()
+
+    # COMMAND is last and may itself contain " ; ", so split at most three times
+    fields = line[m.end():].split(" ; ", 3)
+    if len(fields) != 4:
+        return None
+    tty, pwd, target_user, command = fields
+    if not (
+        tty.startswith("TTY=")
+        and pwd.startswith("PWD=")
+        and target_user.startswith("USER=")
+        and command.startswith("COMMAND=")
+    ):
+        return None
+    command = command[8:].strip()
+    if not command:
+        return None
 
+    return SudoLogEvent(
+        timestamp=_parse_syslog_timestamp(timestamp, reference_time, last_timestamp),
+        username=username,
+        tty=tty[4:],
+        working_dir=pwd[4:],
+        target_user=target_user[5:],
+        command=command,
+        raw_line=line,
+    )
 
-def parse_journalctl_json(json_line: str) -> AuthEvent | None:
+
+def parse_journalctl_json(json_line: str | bytes) -> AuthEvent | None:
     """Parse a single journalctl JSON line into an AuthEvent."""
+    # Entries from other services are the majority; skip them unparsed
+    if (b"sshd" if isinstance(json_line, bytes) else "sshd") not in json_line:
+        return None
+
     try:
-        data = json.loads(json_line)
-    except (json.JSONDecodeError, ValueError):
+        data = _json_loads(json_line)
+    except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError
         return None
 
     message = data.get("MESSAGE", "")
@@ -281,14 +336,21 @@ def parse_journalctl_json(json_line: str) -> AuthEvent | None:
         # Replace timestamp with the real one from journald
         event.timestamp = ts
         event.pid = int(pid) if pid else event.pid
-        event.raw_line = json_line
+        event.raw_line = (
+            json_line.decode("utf-8", errors="replace")
+            if isinstance(json_line, bytes) else json_line
+        )
         return event
 
     return None
 
 
-def parse_journalctl_output(content: str) -> list[AuthEvent]:
-    """Parse multi-line journalctl JSON output into AuthEvents."""
+def parse_journalctl_output(content: str | bytes) -> list[AuthEvent]:
+    """Parse multi-line journalctl JSON output into AuthEvents.
+
+    ``content`` may be raw command output bytes, which orjson parses without
+    a separate decode step.
+    """
     events = []
     for line in content.splitlines():
         line = line.strip()
@@ -300,9 +362,11 @@ def parse_journalctl_output(content: str) -> list[AuthEvent]:
     return events
 
 
-def detect_log_paths(os_type: str) -> list[str]:
+_AIX_LOG_PATHS = ("/var/adm/syslog", "/var/log/syslog")
+# Linux - try both Debian and RHEL paths
+_LINUX_LOG_PATHS = ("/var/log/auth.log", "/var/log/secure")
+
+
+def detect_log_paths(os_type: str) -> tuple[str, ...]:
     """Return the log file paths to check for a given OS type."""
-    if os_type == "aix":
-        return ["/var/adm/syslog", "/var/log/syslog"]
-    # Linux - try both Debian and RHEL paths
-    return ["/var/log/auth.log", "/var/log/secure"]
+    return _AIX_LOG_PATHS if os_type == "aix" else _LINUX_LOG_PATHS
@@ -2,17 +2,55 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import stat
+import weakref
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
 import asyncssh
 
+from keyspider.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Tail reads walk backwards from the end of a file in chunks of this size
+_TAIL_CHUNK_SIZE = 1024 * 1024
+
+# One SFTP session per connection, shared by every read/stat on it. Entries go
+# away with the connection: a closed channel drops its reference back to it.
+_sftp_clients: weakref.WeakKeyDictionary[
+    asyncssh.SSHClientConnection, asyncio.Future[asyncssh.SFTPClient]
+] = weakref.WeakKeyDictionary()
+
+
+async def _get_sftp(conn: asyncssh.SSHClientConnection) -> asyncssh.SFTPClient:
+    """Return the connection's SFTP client, starting the subsystem on first use.
+
+    The pending start is cached rather than the client, so concurrent callers
+    on one connection share a single subsystem handshake.
+    """
+    fut = _sftp_clients.get(conn)
+    if fut is None:
+        fut = _sftp_clients[conn] = asyncio.ensure_future(conn.start_sftp_client())
+    try:
+        return await asyncio.shield(fut)
+    except BaseException:
+        # Only a failed start is evicted; a cancelled caller leaves it running
+        if fut.done() and _sftp_clients.get(conn) is fut:
+            del _sftp_clients[conn]
+        raise
+
+
+def _discard_sftp(conn: asyncssh.SSHClientConnection, exc: BaseException) -> None:
+    """Forget a cached SFTP client after a failure that is not file-level."""
+    if not isinstance(exc, asyncssh.SFTPError):
+        _sftp_clients.pop(conn, None)
 
-@dataclass
+
+@dataclass(slots=True)
 class FileInfo:
     """File metadata from SFTP stat."""
 
@@ -22,6 +60,38 @@ class FileInfo:
     exists: bool = True
 
 
+def _file_info(attrs: asyncssh.SFTPAttrs) -> FileInfo:
+    """Build FileInfo from SFTP attributes."""
+    mtime = None
+    if attrs.mtime is not None:
+        mtime = datetime.fromtimestamp(attrs.mtime, tz=timezone.utc)
+
+    perms = ""
+    if attrs.permissions is not None:
+        perms = format(stat.S_IMODE(attrs.permissions), "04o")  # e.g. "0644"
+
+    return FileInfo(
+        mtime=mtime,
+        size=attrs.size or 0,
+        permissions=perms,
+    )
+
+
+def _iter_lines(chunks: list[bytes], skip: int) -> Iterator[str]:
+    """Yield decoded lines from consecutive byte chunks, skipping the first ``skip``."""
+    index = 0
+    carry = b""
+    for chunk in chunks:
+        parts = (carry + chunk).split(b"\n")
+        carry = parts.pop()
+        for part in parts:
+            if index >= skip:
+                yield part.decode("utf-8", errors="replace")
+            index += 1
+    if carry and index >= skip:
+        yield carry.decode("utf-8", errors="replace")
+
+
 class SFTPReader:
     """Wraps asyncssh SFTP client for secure file operations."""
 
@@ -33,26 +103,31 @@ class SFTPReader:
     ) -> str | None:
         """Read a file via SFTP. Returns content or None if not found."""
         try:
-            async with conn.start_sftp_client() as sftp:
-                try:
-                    attrs = await sftp.stat(path)
-                except asyncssh.SFTPNoSuchFile:
-                    return None
-
-                if attrs.size and attrs.size > max_bytes:
-                    logger.warning(
-                        "File %s is %d bytes, exceeds max %d, truncating",
-                        path, attrs.size, max_bytes,
-                    )
-
-                async with sftp.open(path, "r") as f:
-                    content = await f.read(max_bytes)
-                    if isinstance(content, bytes):
-                        return content.decode("utf-8", errors="replace")
-                    return content
+            sftp = await _get_sftp(conn)
+            try:
+                attrs = await sftp.stat(path)
+            except asyncssh.SFTPNoSuchFile:
+                return None
+
+            if attrs.size and attrs.size > max_bytes:
+                logger.warning(
+                    "File %s is %d bytes, exceeds max %d, truncating",
+                    path, attrs.size, max_bytes,
+                )
+
+            async with sftp.open(
+                path, "r",
+                block_size=settings.sftp_block_size,
+                max_requests=settings.sftp_max_requests,
+            ) as f:
+                content = await f.read(max_bytes)
+                if isinstance(content, bytes):
+                    return content.decode("utf-8", errors="replace")
+                return content
         except asyncssh.SFTPNoSuchFile:
             return None
         except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
             logger.debug("SFTP read failed for %s: %s", path, e)
             return None
 
@@ -67,43 +142,65 @@ class SFTPReader:
 
         Reads from the end of the file to find enough newlines.
         """
-        try:
-            async with conn.start_sftp_client() as sftp:
-                try:
-                    attrs = await sftp.stat(path)
-                except asyncssh.SFTPNoSuchFile:
-                    return None
-
-                file_size = attrs.size or 0
-                if file_size == 0:
-                    return ""
-
-                # If file is small enough, just read it all
-                read_size = min(file_size, max_bytes)
-
-                async with sftp.open(path, "rb") as f:
-                    if read_size < file_size:
-                        # Seek to near end
-                        await f.seek(file_size - read_size)
-                    raw = await f.read(read_size)
-
-                content = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
-                lines = content.splitlines()
+        lines = await SFTPReader.read_tail_lines(conn, path, max_lines, max_bytes)
+        if lines is None:
+            return None
+        return "\n".join(lines)
 
-                # If we seeked into the middle, drop the first partial line
-                if read_size < file_size and lines:
-                    lines = lines[1:]
+    @staticmethod
+    async def read_tail_lines(
+        conn: asyncssh.SSHClientConnection,
+        path: str,
+        max_lines: int = 50000,
+        max_bytes: int = 50 * 1024 * 1024,
+    ) -> Iterator[str] | None:
+        """Read the last N lines of a file via SFTP as a lazy line iterator.
 
-                if len(lines) > max_lines:
-                    lines = lines[-max_lines:]
+        The file is read backwards in chunks only until enough newlines have
+        been seen (or max_bytes is reached), and lines are decoded one at a
+        time as the iterator is consumed. Returns None if not found.
+        """
+        try:
+            sftp = await _get_sftp(conn)
+            try:
+                attrs = await sftp.stat(path)
+            except asyncssh.SFTPNoSuchFile:
+                return None
 
-                return "\n".join(lines)
+            file_size = attrs.size or 0
+            floor = max(0, file_size - max_bytes)
+            chunks: list[bytes] = []
+            newlines = 0
+            pos = file_size
+            async with sftp.open(
+                path, "rb",
+                block_size=settings.sftp_block_size,
+                max_requests=settings.sftp_max_requests,
+            ) as f:
+                # A partial first line is dropped, so stop one newline past max_lines
+                while pos > floor and newlines <= max_lines:
+                    size = min(_TAIL_CHUNK_SIZE, pos - floor)
+                    pos -= size
+                    await f.seek(pos)
+                    chunk = await f.read(size)
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    chunks.append(chunk)
+                    newlines += chunk.count(b"\n")
         except asyncssh.SFTPNoSuchFile:
             return None
         except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
             logger.debug("SFTP tail read failed for %s: %s", path, e)
             return None
 
+        chunks.reverse()
+        total = newlines + (1 if chunks and not chunks[-1].endswith(b"\n") else 0)
+        # If we started in the middle, the first line is partial
+        partial = 1 if pos > 0 else 0
+        skip = partial + max(0, total - partial - max_lines)
+        return _iter_lines(chunks, skip)
+
     @staticmethod
     async def stat_file(
         conn: asyncssh.SSHClientConnection,
@@ -111,25 +208,12 @@ class SFTPReader:
     ) -> FileInfo | None:
         """Get file metadata via SFTP stat."""
         try:
-            async with conn.start_sftp_client() as sftp:
-                attrs = await sftp.stat(path)
-                mtime = None
-                if attrs.mtime is not None:
-                    mtime = datetime.fromtimestamp(attrs.mtime, tz=timezone.utc)
-
-                perms = ""
-                if attrs.permissions is not None:
-                    perms = oct(stat.S_IMODE(attrs.permissions))[2:]  # e.g. "644"
-                    perms = perms.zfill(4)  # "0644"
-
-                return FileInfo(
-                    mtime=mtime,
-                    size=attrs.size or 0,
-                    permissions=perms,
-                )
+            sftp = await _get_sftp(conn)
+            return _file_info(await sftp.stat(path))
         except asyncssh.SFTPNoSuchFile:
             return None
         except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
             logger.debug("SFTP stat failed for %s: %s", path, e)
             return None
 
@@ -140,15 +224,55 @@ class SFTPReader:
     ) -> list[str] | None:
         """List directory entries via SFTP."""
         try:
-            async with conn.start_sftp_client() as sftp:
-                entries = await sftp.listdir(path)
-                return entries
+            sftp = await _get_sftp(conn)
+            entries = await sftp.listdir(path)
+            return entries
         except asyncssh.SFTPNoSuchFile:
             return None
         except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
             logger.debug("SFTP listdir failed for %s: %s", path, e)
             return None
 
+    @staticmethod
+    async def list_dir_with_stat(
+        conn: asyncssh.SSHClientConnection,
+        path: str,
+    ) -> dict[str, FileInfo] | None:
+        """List directory entries with their metadata in one SFTP round trip.
+
+        Symlinks are resolved with a follow-up stat so the metadata matches
+        stat_file; links whose target cannot be stat'ed are left out.
+        """
+        try:
+            sftp = await _get_sftp(conn)
+            entries = {
+                name.filename: name.attrs
+                for name in await sftp.readdir(path)
+                if name.filename not in (".", "..")
+            }
+            links = [
+                filename for filename, attrs in entries.items()
+                if attrs.permissions is not None and stat.S_ISLNK(attrs.permissions)
+            ]
+            targets = await asyncio.gather(
+                *(sftp.stat(f"{path}/{filename}") for filename in links),
+                return_exceptions=True,
+            )
+            for filename, target in zip(links, targets):
+                if isinstance(target, Exception):
+                    logger.debug("SFTP stat failed for %s/%s: %s", path, filename, target)
+                    del entries[filename]
+                else:
+                    entries[filename] = target
+            return {filename: _file_info(attrs) for filename, attrs in entries.items()}
+        except asyncssh.SFTPNoSuchFile:
+            return None
+        except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
+            logger.debug("SFTP readdir failed for %s: %s", path, e)
+            return None
+
     @staticmethod
     async def file_exists(
         conn: asyncssh.SSHClientConnection,
@@ -156,12 +280,13 @@ class SFTPReader:
     ) -> bool:
         """Check if a file exists via SFTP stat."""
         try:
-            async with conn.start_sftp_client() as sftp:
-                await sftp.stat(path)
-                return True
+            sftp = await _get_sftp(conn)
+            await sftp.stat(path)
+            return True
         except asyncssh.SFTPNoSuchFile:
             return False
-        except (asyncssh.SFTPError, asyncssh.Error, OSError):
+        except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
             return False
 
     @staticmethod
@@ -171,8 +296,9 @@ class SFTPReader:
     ) -> int | None:
         """Get file size in bytes, or None if not found."""
         try:
-            async with conn.start_sftp_client() as sftp:
-                attrs = await sftp.stat(path)
-                return attrs.size or 0
-        except (asyncssh.SFTPNoSuchFile, asyncssh.SFTPError, asyncssh.Error, OSError):
+            sftp = await _get_sftp(conn)
+            attrs = await sftp.stat(path)
+            return attrs.size or 0
+        except (asyncssh.SFTPError, asyncssh.Error, OSError) as e:
+            _discard_sftp(conn, e)
             return None
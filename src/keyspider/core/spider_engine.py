@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
@@ -32,7 +33,7 @@ from keyspider.models.unreachable_source import UnreachableSource
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SpiderProgress:
     """Tracks spider crawl progress."""
 
@@ -42,8 +43,8 @@ class SpiderProgress:
     unreachable_found: int = 0
     current_depth: int = 0
     current_server: str = ""
-    visited: set[str] = field(default_factory=set)
-    queue: list[tuple[str, int, int]] = field(default_factory=list)  # (hostname, port, depth)
+    visited: set[tuple[str, int]] = field(default_factory=set)  # (hostname, port)
+    queue: deque[tuple[str, int, int]] = field(default_factory=deque)  # (hostname, port, depth)
 
 
 class SpiderEngine:
@@ -73,9 +74,9 @@ class SpiderEngine:
         self.progress.queue.append((seed_hostname, seed_port, 0))
 
         while self.progress.queue and not self._cancelled:
-            hostname, port, depth = self.progress.queue.pop(0)
+            hostname, port, depth = self.progress.queue.popleft()
 
-            server_key = f"{hostname}:{port}"
+            server_key = (hostname, port)
             if server_key in self.progress.visited:
                 continue
             if depth > self.max_depth:
@@ -453,7 +454,7 @@ class SpiderEngine:
         existing = result.scalar_one_or_none()
 
         if existing:
-            server_key = f"{existing.ip_address}:{existing.ssh_port}"
+            server_key = (existing.ip_address, existing.ssh_port)
             if server_key not in self.progress.visited:
                 self.progress.queue.append(
                     (existing.ip_address, existing.ssh_port, current_depth + 1)
@@ -5,7 +5,10 @@ from __future__ import annotations
 import asyncio
 import ipaddress
 import logging
+import re
 import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 
 from keyspider.core.ssh_connector import SSHConnectionPool
@@ -21,47 +24,79 @@ _PRIVATE_RANGES = [
     ipaddress.ip_network("fc00::/7"),  # IPv6 ULA
 ]
 
+# Dotted-quad IPv4 without leading zeros (matching inet_pton's rules)
+_IPV4_RE = re.compile(r"(0|[1-9][0-9]{0,2})\.(0|[1-9][0-9]{0,2})\.(0|[1-9][0-9]{0,2})\.(0|[1-9][0-9]{0,2})")
+
+# (network, netmask) integer pairs so membership is a single mask-and-compare
+_V6_RANGES = [
+    (int(net.network_address), int(net.netmask))
+    for net in _PRIVATE_RANGES if net.version == 6
+]
+
+# Dedicated threads for blocking reverse DNS so slow lookups cannot starve
+# the loop's default executor; sized for resolver concurrency, not CPUs.
+_dns_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="rdns")
+
+
+@lru_cache(maxsize=4096)
+def _is_private_ip(ip: str) -> bool:
+    m = _IPV4_RE.fullmatch(ip)
+    if m:
+        a, b, c, d = map(int, m.groups())
+        if a > 255 or b > 255 or c > 255 or d > 255:
+            return False
+        x = (a << 24) | (b << 16) | (c << 8) | d
+        # 10.0.0.0/8 | 172.16.0.0/12 | 192.168.0.0/16
+        return (
+            (x & 0xFF000000) == 0x0A000000
+            or (x & 0xFFF00000) == 0xAC100000
+            or (x & 0xFFFF0000) == 0xC0A80000
+        )
+
+    if ":" not in ip:
+        return False
+    try:
+        ip_int = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+    except OSError:
+        return False
+    return any(ip_int & mask == net for net, mask in _V6_RANGES)
+
 
 class UnreachableDetector:
     """Detects and classifies unreachable SSH sources."""
 
-    def __init__(self, pool: SSHConnectionPool):
+    def __init__(self, pool: SSHConnectionPool, max_parallel_lookups: int = 16):
         self.pool = pool
         self._reachability_cache: dict[str, tuple[bool, float]] = {}
         self._cache_ttl = 3600  # 1 hour
+        # Bound concurrent reverse DNS lookups to avoid overloading the resolver
+        self._lookup_semaphore = asyncio.Semaphore(max_parallel_lookups)
 
     async def check_reachable(self, ip: str, port: int = 22) -> bool:
         """Check if an IP is reachable via SSH, with caching."""
-        import time
-
         cache_key = f"{ip}:{port}"
         if cache_key in self._reachability_cache:
             is_reachable, cached_at = self._reachability_cache[cache_key]
-            if time.time() - cached_at < self._cache_ttl:
+            if time.monotonic() - cached_at < self._cache_ttl:
                 return is_reachable
 
         is_reachable = await self.pool.check_reachable(ip, port)
-        self._reachability_cache[cache_key] = (is_reachable, time.time())
+        self._reachability_cache[cache_key] = (is_reachable, time.monotonic())
         return is_reachable
 
     async def reverse_lookup(self, ip: str) -> str | None:
         """Attempt reverse DNS lookup for an IP."""
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, lambda: socket.gethostbyaddr(ip)
-            )
+            async with self._lookup_semaphore:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(_dns_executor, socket.gethostbyaddr, ip)
             return result[0]
         except (socket.herror, socket.gaierror, OSError):
             return None
 
     def is_private_ip(self, ip: str) -> bool:
         """Check if an IP is in a private (RFC1918/ULA) range."""
-        try:
-            addr = ipaddress.ip_address(ip)
-            return any(addr in net for net in _PRIVATE_RANGES)
-        except ValueError:
-            return False
+        return _is_private_ip(ip)
 
     async def classify_severity(
         self,
@@ -69,6 +104,7 @@ class UnreachableDetector:
         target_server: Server,
         username: str | None = None,
         fingerprint: str | None = None,
+        is_private: bool | None = None,
     ) -> str:
         """Classify the severity of an unreachable source.
 
@@ -77,8 +113,11 @@ class UnreachableDetector:
         - high: Any key used from unreachable, non-RFC1918 source
         - medium: Key from unreachable RFC1918 (internal) source
         - low: Failed auth attempts from unreachable source
+
+        ``is_private`` may be passed in when the caller has already computed it.
         """
-        is_private = self.is_private_ip(source_ip)
+        if is_private is None:
+            is_private = self.is_private_ip(source_ip)
 
         if username == "root" and fingerprint:
             return "critical"
@@ -98,24 +137,38 @@ class UnreachableDetector:
     ) -> list[dict]:
         """Scan a list of source IPs for unreachable ones.
 
+        Each IP is probed and, if unreachable, resolved and classified as soon
+        as its own probe finishes, so DNS work overlaps with slower probes.
+        All work runs in a TaskGroup, so an unexpected failure cancels the
+        remaining probes instead of leaving them running. Results are
+        returned in completion order.
+
         Returns list of dicts with IP, reachability, severity info.
         """
-        results = []
-        tasks = [self.check_reachable(ip) for ip in source_ips]
-        reachability = await asyncio.gather(*tasks, return_exceptions=True)
+        results: list[dict] = []
 
-        for ip, is_reachable in zip(source_ips, reachability):
-            if isinstance(is_reachable, Exception):
+        async def _probe_and_resolve(ip: str) -> None:
+            try:
+                is_reachable = await self.check_reachable(ip)
+            except Exception:
                 is_reachable = False
+            if is_reachable:
+                return
 
-            if not is_reachable:
-                reverse_dns = await self.reverse_lookup(ip)
-                severity = await self.classify_severity(ip, target_server)
-                results.append({
-                    "source_ip": ip,
-                    "reverse_dns": reverse_dns,
-                    "severity": severity,
-                    "is_private": self.is_private_ip(ip),
-                })
+            is_private = self.is_private_ip(ip)
+            reverse_dns, severity = await asyncio.gather(
+                self.reverse_lookup(ip),
+                self.classify_severity(ip, target_server, is_private=is_private),
+            )
+            results.append({
+                "source_ip": ip,
+                "reverse_dns": reverse_dns,
+                "severity": severity,
+                "is_private": is_private,
+            })
+
+        async with asyncio.TaskGroup() as tg:
+            for ip in source_ips:
+                tg.create_task(_probe_and_resolve(ip))
 
         return results
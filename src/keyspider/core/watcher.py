@@ -14,6 +14,9 @@ from keyspider.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bytes requested per read from the remote tail process
+_READ_CHUNK_SIZE = 65536
+
 
 class LogWatcher:
     """Watches SSH auth logs on a remote server in real time."""
@@ -36,12 +39,17 @@ class LogWatcher:
         self._conn: asyncssh.SSHClientConnection | None = None
         self._process: asyncssh.SSHClientProcess | None = None
         self._running = False
-        self._callbacks: list[Callable[[AuthEvent], None]] = []
-        self._event_queues: list[asyncio.Queue[AuthEvent | None]] = []
+        self._callbacks: set[Callable[[AuthEvent], None]] = set()
+        self._batch_callbacks: set[Callable[[list[AuthEvent]], None]] = set()
+        self._event_queues: set[asyncio.Queue[list[AuthEvent] | None]] = set()
 
     def on_event(self, callback: Callable[[AuthEvent], None]) -> None:
         """Register a callback for new auth events."""
-        self._callbacks.append(callback)
+        self._callbacks.add(callback)
+
+    def on_events(self, callback: Callable[[list[AuthEvent]], None]) -> None:
+        """Register a callback that receives each read's events as one list."""
+        self._batch_callbacks.add(callback)
 
     async def start(self) -> None:
         """Start watching the auth log."""
@@ -87,21 +95,40 @@ class LogWatcher:
 
         logger.info("Watcher started for %s:%d on %s", self.hostname, self.port, log_path)
 
-        async for line in self._process.stdout:
-            if not self._running:
+        # Read in large chunks and parse every complete line at once; a
+        # trailing partial line is carried over to the next read.
+        pending = ""
+        while self._running:
+            chunk = await self._process.stdout.read(_READ_CHUNK_SIZE)
+            if not chunk:
                 break
 
-            line = line.strip()
-            if not line:
-                continue
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            events = self._parse_lines(lines)
+            if events:
+                self._dispatch(events)
+
+    def _parse_lines(self, lines: list[str]) -> list[AuthEvent]:
+        """Parse raw log lines, dropping blanks and unrecognized entries."""
+        os_type = self.os_type
+        parsed = (parse_line(line, os_type) for line in map(str.strip, lines) if line)
+        return [event for event in parsed if event]
+
+    def _dispatch(self, events: list[AuthEvent]) -> None:
+        """Deliver a batch of events to all registered callbacks."""
+        for batch_callback in self._batch_callbacks:
+            try:
+                batch_callback(events)
+            except Exception as e:
+                logger.error("Watcher callback error: %s", e)
 
-            event = parse_line(line, self.os_type)
-            if event:
-                for callback in self._callbacks:
-                    try:
-                        callback(event)
-                    except Exception as e:
-                        logger.error("Watcher callback error: %s", e)
+        for callback in self._callbacks:
+            for event in events:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error("Watcher callback error: %s", e)
 
     async def stop(self) -> None:
         """Stop the watcher and unblock all event generators."""
@@ -128,27 +155,31 @@ class LogWatcher:
 
     async def events(self) -> AsyncIterator[AuthEvent]:
         """Async iterator that yields auth events."""
-        queue: asyncio.Queue[AuthEvent | None] = asyncio.Queue()
-        self._event_queues.append(queue)
+        queue: asyncio.Queue[list[AuthEvent] | None] = asyncio.Queue()
+        self._event_queues.add(queue)
 
-        def enqueue(event: AuthEvent):
-            queue.put_nowait(event)
+        def enqueue(events: list[AuthEvent]):
+            queue.put_nowait(events)
 
-        self.on_event(enqueue)
+        self.on_events(enqueue)
 
         try:
             while self._running:
                 try:
-                    event = await asyncio.wait_for(queue.get(), timeout=1.0)
-                    if event is None:
-                        # Sentinel received - watcher is stopping
-                        break
-                    yield event
+                    batch = await asyncio.wait_for(queue.get(), timeout=1.0)
                 except asyncio.TimeoutError:
                     continue
+                # Drain everything already queued before waiting again
+                batches = [batch]
+                while not queue.empty():
+                    batches.append(queue.get_nowait())
+                for batch in batches:
+                    if batch is None:
+                        # Sentinel received - watcher is stopping
+                        return
+                    for event in batch:
+                        yield event
         finally:
             # Clean up callback and queue reference
-            if enqueue in self._callbacks:
-                self._callbacks.remove(enqueue)
-            if queue in self._event_queues:
-                self._event_queues.remove(queue)
+            self._batch_callbacks.discard(enqueue)
+            self._event_queues.discard(queue)
@@ -4,28 +4,105 @@ from __future__ import annotations
 
 from typing import Any, Sequence, TypeVar
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Insert, Result, Select, column, func, insert, select, table
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from keyspider.db.session import Base
+from keyspider.models.server import Server
 
 T = TypeVar("T", bound=Base)
 
+# Below this many rows a multi-row INSERT is as fast as COPY
+_COPY_MIN_ROWS = 1000
+
 
 async def paginate(
     session: AsyncSession,
     stmt: Select,
     offset: int = 0,
     limit: int = 50,
+    count_stmt: Select | None = None,
 ) -> tuple[Sequence[Any], int]:
-    """Execute a paginated query, returning (items, total_count)."""
-    count_stmt = select(func.count()).select_from(stmt.subquery())
+    """Execute a paginated query, returning (items, total_count).
+
+    The total is counted over ``stmt`` as a subquery unless the caller passes
+    its own ``count_stmt`` (e.g. a direct ``SELECT count(*)`` that can use an
+    index-only scan). Both statements run on the session's connection, so
+    they share its transaction and hold a single pooled connection.
+    """
+    if count_stmt is None:
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
     total = (await session.execute(count_stmt)).scalar() or 0
     result = await session.execute(stmt.offset(offset).limit(limit))
     items = result.scalars().all()
     return items, total
 
 
+def dialect_insert(session: AsyncSession, model: type[Base]):
+    """Return an INSERT for ``model`` that supports ON CONFLICT clauses.
+
+    Uses the PostgreSQL construct, or the SQLite one for local development.
+    """
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+async def bulk_insert(
+    session: AsyncSession, model: type[Base], rows: Sequence[dict[str, Any]]
+) -> None:
+    """Insert plain row dicts for ``model`` in the session's transaction.
+
+    Large batches on asyncpg are streamed with COPY FROM STDIN; everything
+    else goes through a single executemany INSERT. Every row must carry the
+    same keys, and columns left out rely on server defaults under COPY.
+    """
+    if not rows:
+        return
+    if len(rows) >= _COPY_MIN_ROWS and session.bind.dialect.driver == "asyncpg":
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        columns = list(rows[0])
+        await raw.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+        return
+    await session.execute(insert(model), rows)
+
+
+async def staged_execute(
+    session: AsyncSession, stmt: Insert, rows: Sequence[dict[str, Any]]
+) -> Result:
+    """Execute an INSERT (typically with ON CONFLICT/RETURNING) for many rows.
+
+    Large batches on asyncpg are COPYed into a temporary staging table and
+    applied with one INSERT ... SELECT, so conflict handling and RETURNING
+    still work. Every row must carry the same keys.
+    """
+    if len(rows) < _COPY_MIN_ROWS or session.bind.dialect.driver != "asyncpg":
+        return await session.execute(stmt, rows)
+
+    columns = list(rows[0])
+    stage = f"_stage_{stmt.table.name}"
+    conn = await session.connection()
+    await conn.exec_driver_sql(f"DROP TABLE IF EXISTS {stage}")
+    await conn.exec_driver_sql(
+        f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+        f"SELECT {', '.join(columns)} FROM {stmt.table.name} WITH NO DATA"
+    )
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        stage,
+        records=[tuple(row[c] for c in columns) for row in rows],
+        columns=columns,
+    )
+    staged = table(stage, *(column(c) for c in columns))
+    return await session.execute(stmt.from_select(columns, select(staged)))
+
+
 async def get_or_create(
     session: AsyncSession,
     model: type[T],
@@ -43,3 +120,17 @@ async def get_or_create(
     session.add(instance)
     await session.flush()
     return instance, True
+
+
+async def find_server_by_host(session: AsyncSession, host: str) -> Server | None:
+    """Look up a server by hostname (case-insensitive) or IP address.
+
+    Hostnames may differ only in case; the exact spelling is preferred.
+    """
+    result = await session.execute(
+        select(Server)
+        .where((func.lower(Server.hostname) == host.lower()) | (Server.ip_address == host))
+        .order_by((Server.hostname == host).desc(), Server.id)
+        .limit(1)
+    )
+    return result.scalars().first()
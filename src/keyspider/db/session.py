@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -25,12 +25,24 @@ _is_sqlite = settings.database_url.startswith("sqlite")
 
 if _is_sqlite:
     engine = create_async_engine(settings.database_url, echo=False)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed during writes; NORMAL sync is safe with WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
 else:
     engine = create_async_engine(
         settings.database_url,
         echo=False,
         pool_size=20,
         max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        pool_use_lifo=True,  # keep a warm subset of connections in use
+        insertmanyvalues_page_size=1000,
     )
 
 async_session_factory = async_sessionmaker(
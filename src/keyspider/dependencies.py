@@ -2,23 +2,79 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy import select
+from sqlalchemy import case, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from keyspider.config import settings
 from keyspider.db.session import get_session
-from keyspider.models.api_key import APIKey
+from keyspider.models.api_key import API_KEY_PREFIX_LENGTH, APIKey, hash_api_key
 from keyspider.models.user import User
 
 security = HTTPBearer(auto_error=False)
 
 
+@dataclass(frozen=True, slots=True)
+class CurrentUserLite:
+    """The authenticated principal, loaded without hydrating the full User row."""
+
+    id: int
+    username: str
+    role: str
+    is_active: bool
+
+
+_USER_LITE_COLUMNS = (User.id, User.username, User.role, User.is_active)
+
+# API key id -> most recent use. Written on the auth hot path and persisted
+# in one UPDATE by flush_api_key_usage() so requests never wait on a commit.
+_pending_last_used: dict[int, datetime] = {}
+
+# blake2b(token) -> (user_id, monotonic deadline) for recently verified JWTs,
+# so repeat requests with the same token skip jwt.decode. Entries never
+# outlive the token's own exp claim.
+_TOKEN_CACHE_MAX_SIZE = 4096
+_TOKEN_CACHE_TTL = 60.0
+_token_cache: dict[bytes, tuple[int, float]] = {}
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _get_cached_token(digest: bytes) -> int | None:
+    entry = _token_cache.get(digest)
+    if entry is None:
+        return None
+    user_id, deadline = entry
+    if deadline <= time.monotonic():
+        _token_cache.pop(digest, None)
+        return None
+    return user_id
+
+
+def _cache_token(digest: bytes, user_id: int, exp: int | float | None) -> None:
+    ttl = _TOKEN_CACHE_TTL
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl <= 0:
+        return
+    if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _token_cache.pop(next(iter(_token_cache)))
+    _token_cache[digest] = (user_id, time.monotonic() + ttl)
+
+
 async def get_db() -> AsyncSession:
     """Get a database session."""
     async for session in get_session():
@@ -28,7 +84,7 @@ async def get_db() -> AsyncSession:
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+) -> CurrentUserLite:
     """Get the current authenticated user from JWT or API key."""
     if not credentials:
         raise HTTPException(
@@ -38,56 +94,110 @@ async def get_current_user(
 
     token = credentials.credentials
 
-    # Try JWT first
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        sub = payload.get("sub")
-        if sub is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        user_id = int(sub)
-
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.is_active:
+    # Try JWT first, reusing a recent verification of the same token
+    digest = _token_digest(token)
+    user_id = _get_cached_token(digest)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError:
+            payload = None
+        if payload is not None:
+            sub = payload.get("sub")
+            if sub is None:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+            user_id = int(sub)
+            _cache_token(digest, user_id, payload.get("exp"))
+
+    if user_id is not None:
+        result = await db.execute(select(*_USER_LITE_COLUMNS).where(User.id == user_id))
+        row = result.one_or_none()
+        if not row or not row.is_active:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
-        return user
-
-    except JWTError:
-        pass
+        return CurrentUserLite(*row)
 
-    # Try API key
-    from passlib.hash import bcrypt
-
-    prefix = token[:8] if len(token) >= 8 else token
+    # Try API key; load the key and its owner in one round-trip
+    prefix = token[:API_KEY_PREFIX_LENGTH]
     result = await db.execute(
-        select(APIKey).where(APIKey.key_prefix == prefix)
+        select(APIKey, *_USER_LITE_COLUMNS)
+        .join(User, User.id == APIKey.user_id)
+        .where(APIKey.key_prefix == prefix)
+        .limit(1)
     )
-    api_keys = result.scalars().all()
+    row = result.one_or_none()
+
+    if not row or not await _verify_api_key(db, token, row.APIKey):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    api_key = row.APIKey
+    user = CurrentUserLite(*row[1:])
+
+    # Check expiry
+    if api_key.expires_at and api_key.expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key expired")
 
-    for api_key in api_keys:
-        if bcrypt.verify(token, api_key.key_hash):
-            # Check expiry
-            if api_key.expires_at and api_key.expires_at < datetime.now(timezone.utc):
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key expired")
+    # Record last use; persisted in batches by flush_api_key_usage()
+    _pending_last_used[api_key.id] = datetime.now(timezone.utc)
 
-            # Update last used
-            api_key.last_used_at = datetime.now(timezone.utc)
-            await db.commit()
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
+    return user
 
-            # Get the user
-            result = await db.execute(select(User).where(User.id == api_key.user_id))
-            user = result.scalar_one_or_none()
-            if not user or not user.is_active:
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
-            return user
 
-    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+async def _verify_api_key(db: AsyncSession, token: str, api_key: APIKey) -> bool:
+    """Check ``token`` against the stored hash of ``api_key``.
+
+    Keys issued before API keys moved to keyed BLAKE2b still carry a bcrypt
+    hash; those are verified once with bcrypt and rehashed on success.
+    """
+    if not api_key.key_hash.startswith("$2"):
+        return hmac.compare_digest(hash_api_key(token), api_key.key_hash)
+
+    import bcrypt
+
+    # bcrypt is deliberately slow; keep it off the event loop
+    try:
+        if not await asyncio.to_thread(
+            bcrypt.checkpw, token.encode(), api_key.key_hash.encode()
+        ):
+            return False
+    except ValueError:  # tokens over bcrypt's 72-byte limit cannot match
+        return False
+    api_key.key_hash = hash_api_key(token)
+    await db.commit()
+    return True
+
+
+async def flush_api_key_usage(session: AsyncSession) -> int:
+    """Persist buffered API key last_used_at timestamps in a single UPDATE.
+
+    Returns the number of keys updated.
+    """
+    global _pending_last_used
+    if not _pending_last_used:
+        return 0
+
+    pending, _pending_last_used = _pending_last_used, {}
+    try:
+        await session.execute(
+            update(APIKey)
+            .where(APIKey.id.in_(pending))
+            .values(last_used_at=case(pending, value=APIKey.id))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    except BaseException:
+        # Keep the batch for the next flush; uses recorded since then win
+        _pending_last_used = {**pending, **_pending_last_used}
+        raise
+    return len(pending)
 
 
 def require_role(*roles: str):
     """Dependency that requires the user to have one of the specified roles."""
 
-    async def check_role(user: Annotated[User, Depends(get_current_user)]) -> User:
+    async def check_role(
+        user: Annotated[CurrentUserLite, Depends(get_current_user)],
+    ) -> CurrentUserLite:
         if user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -100,6 +210,6 @@ def require_role(*roles: str):
 
 # Common dependency aliases
 DbSession = Annotated[AsyncSession, Depends(get_db)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AdminUser = Annotated[User, Depends(require_role("admin"))]
-OperatorUser = Annotated[User, Depends(require_role("admin", "operator"))]
+CurrentUser = Annotated[CurrentUserLite, Depends(get_current_user)]
+AdminUser = Annotated[CurrentUserLite, Depends(require_role("admin"))]
+OperatorUser = Annotated[CurrentUserLite, Depends(require_role("admin", "operator"))]
@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from keyspider.api.router import api_router
 from keyspider.config import settings
-from keyspider.db.session import Base, engine, _is_sqlite
+from keyspider.db.session import Base, async_session_factory, engine, _is_sqlite
+from keyspider.dependencies import flush_api_key_usage
 
 logger = logging.getLogger(__name__)
 
@@ -37,12 +39,10 @@ async def _init_sqlite_db():
 
     # Seed admin user if none exists
     from sqlalchemy import select
-    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
     from passlib.hash import bcrypt
     from keyspider.models.user import User
 
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with session_factory() as session:
+    async with async_session_factory() as session:
         result = await session.execute(select(User).where(User.username == "admin"))
         if not result.scalar_one_or_none():
             admin = User(
@@ -56,11 +56,33 @@ async def _init_sqlite_db():
             logger.info("Created default admin user (username: admin, password: admin)")
 
 
+async def _flush_api_key_usage_periodically():
+    """Persist buffered API key usage timestamps on a fixed interval."""
+    while True:
+        await asyncio.sleep(settings.api_key_usage_flush_interval)
+        try:
+            async with async_session_factory() as session:
+                await flush_api_key_usage(session)
+        except Exception as e:
+            logger.warning("Failed to flush API key usage: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     if _is_sqlite:
         await _init_sqlite_db()
+    flush_task = asyncio.create_task(_flush_api_key_usage_periodically())
     yield
+    flush_task.cancel()
+    # Let an in-flight periodic flush unwind before the final flush and
+    # engine disposal
+    with suppress(asyncio.CancelledError):
+        await flush_task
+    try:
+        async with async_session_factory() as session:
+            await flush_api_key_usage(session)
+    except Exception as e:
+        logger.warning("Failed to flush API key usage: %s", e)
     await engine.dispose()
 
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, func
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from keyspider.db.session import Base
@@ -22,7 +22,7 @@ class AccessPath(Base):
     username: Mapped[str | None] = mapped_column(String(100))
     first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    event_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     is_authorized: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_used: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
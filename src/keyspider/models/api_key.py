@@ -2,14 +2,35 @@
 
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from keyspider.config import settings
 from keyspider.db.session import Base
 
+# Number of leading characters of the raw key stored in clear for lookup.
+# Long enough that prefix collisions are practically impossible.
+API_KEY_PREFIX_LENGTH = 16
+
+
+def hash_api_key(raw_key: str) -> str:
+    """Hash a server-generated API key with a keyed BLAKE2b digest.
+
+    API keys carry enough entropy that a fast keyed hash is sufficient;
+    bcrypt is reserved for user passwords.
+    """
+    pepper = settings.api_key_pepper.encode()
+    if len(pepper) > 64:
+        # BLAKE2b keys are capped at 64 bytes; reduce longer secrets to a
+        # fixed-size key. Shorter peppers are used as-is so existing hashes
+        # stay valid.
+        pepper = hashlib.blake2b(pepper, digest_size=32).digest()
+    return hashlib.blake2b(raw_key.encode(), key=pepper, digest_size=32).hexdigest()
+
 
 class APIKey(Base):
     __tablename__ = "api_keys"
@@ -19,7 +40,7 @@ class APIKey(Base):
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     key_hash: Mapped[str] = mapped_column(String(255), nullable=False)
-    key_prefix: Mapped[str] = mapped_column(String(10), nullable=False)
+    key_prefix: Mapped[str] = mapped_column(String(32), nullable=False)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     permissions: Mapped[list] = mapped_column(JSONB, nullable=False, default=["read"])
     expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -30,3 +51,8 @@ class APIKey(Base):
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="api_keys")
+
+    __table_args__ = (
+        Index("idx_api_keys_prefix", "key_prefix"),
+        Index("idx_api_keys_user", "user_id"),
+    )
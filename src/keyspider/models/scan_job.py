@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, SmallInteger, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -19,11 +19,11 @@ class ScanJob(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
     initiated_by: Mapped[str] = mapped_column(String(30), nullable=False)
     seed_server_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("servers.id"))
-    max_depth: Mapped[int | None] = mapped_column(Integer, default=10)
-    config: Mapped[dict | None] = mapped_column(JSONB)
+    max_depth: Mapped[int | None] = mapped_column(SmallInteger, default=10)
+    config: Mapped[dict | None] = mapped_column(JSONB, deferred=True, deferred_raiseload=True)
     servers_scanned: Mapped[int] = mapped_column(Integer, default=0)
     keys_found: Mapped[int] = mapped_column(Integer, default=0)
-    events_parsed: Mapped[int] = mapped_column(Integer, default=0)
+    events_parsed: Mapped[int] = mapped_column(BigInteger, default=0)
     unreachable_found: Mapped[int] = mapped_column(Integer, default=0)
     error_message: Mapped[str | None] = mapped_column(Text)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -31,3 +31,13 @@ class ScanJob(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+
+    __table_args__ = (
+        # Supports containment lookups such as config @> '{"depth": 3}'
+        Index(
+            "idx_scan_jobs_config",
+            "config",
+            postgresql_using="gin",
+            postgresql_ops={"config": "jsonb_path_ops"},
+        ),
+    )
@@ -38,18 +38,22 @@ class Server(Base):
     prefer_agent: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
     # Relationships
-    key_locations: Mapped[list["KeyLocation"]] = relationship(back_populates="server", cascade="all, delete-orphan")
+    key_locations: Mapped[list["KeyLocation"]] = relationship(
+        back_populates="server", cascade="all, delete-orphan", lazy="raise"
+    )
     target_events: Mapped[list["AccessEvent"]] = relationship(
-        back_populates="target_server", foreign_keys="AccessEvent.target_server_id"
+        back_populates="target_server", foreign_keys="AccessEvent.target_server_id", lazy="raise"
     )
     source_events: Mapped[list["AccessEvent"]] = relationship(
-        back_populates="source_server", foreign_keys="AccessEvent.source_server_id"
+        back_populates="source_server", foreign_keys="AccessEvent.source_server_id", lazy="raise"
     )
-    watch_sessions: Mapped[list["WatchSession"]] = relationship(back_populates="server")
+    watch_sessions: Mapped[list["WatchSession"]] = relationship(back_populates="server", lazy="raise")
     agent_status: Mapped["AgentStatus | None"] = relationship(back_populates="server", uselist=False)
 
     __table_args__ = (
         UniqueConstraint("ip_address", "ssh_port"),
         Index("idx_servers_ip", "ip_address"),
         Index("idx_servers_hostname", "hostname"),
+        # Case-insensitive hostname lookups match on lower(hostname)
+        Index("idx_servers_hostname_lower", func.lower(hostname)),
     )
@@ -18,7 +18,8 @@ class SSHKey(Base):
     fingerprint_md5: Mapped[str | None] = mapped_column(String(60))
     key_type: Mapped[str] = mapped_column(String(20), nullable=False)
     key_bits: Mapped[int | None] = mapped_column(Integer)
-    public_key_data: Mapped[str | None] = mapped_column(Text)
+    # Only the key detail view reads the key body; load it with undefer()
+    public_key_data: Mapped[str | None] = mapped_column(Text, deferred=True, deferred_raiseload=True)
     comment: Mapped[str | None] = mapped_column(String(500))
     is_host_key: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     first_seen_at: Mapped[datetime] = mapped_column(
@@ -31,11 +32,18 @@ class SSHKey(Base):
     )
 
     # Relationships
-    locations: Mapped[list["KeyLocation"]] = relationship(back_populates="ssh_key", cascade="all, delete-orphan")
-    access_events: Mapped[list["AccessEvent"]] = relationship(back_populates="ssh_key")
-    access_paths: Mapped[list["AccessPath"]] = relationship(back_populates="ssh_key")
+    locations: Mapped[list["KeyLocation"]] = relationship(
+        back_populates="ssh_key", cascade="all, delete-orphan", lazy="raise"
+    )
+    access_events: Mapped[list["AccessEvent"]] = relationship(back_populates="ssh_key", lazy="raise")
+    access_paths: Mapped[list["AccessPath"]] = relationship(back_populates="ssh_key", lazy="raise")
 
     __table_args__ = (
-        Index("idx_ssh_keys_fingerprint", "fingerprint_sha256"),
+        # Covering index so fingerprint -> (id, key_type) lookups skip the heap
+        Index(
+            "idx_ssh_keys_fingerprint",
+            "fingerprint_sha256",
+            postgresql_include=["id", "key_type"],
+        ),
         Index("idx_ssh_keys_md5", "fingerprint_md5"),
     )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, desc, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from keyspider.db.session import Base
@@ -24,15 +24,22 @@ class SudoEvent(Base):
     tty: Mapped[str | None] = mapped_column(String(50))
     event_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     success: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
-    raw_log_line: Mapped[str | None] = mapped_column(Text)
+    raw_log_line: Mapped[str | None] = mapped_column(Text, deferred=True, deferred_raiseload=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
 
     # Relationships
-    server: Mapped["Server"] = relationship()
+    server: Mapped["Server"] = relationship(lazy="raise")
 
     __table_args__ = (
         Index("idx_sudo_events_server_time", "server_id", "event_time"),
         Index("idx_sudo_events_username", "username"),
+        # Recent failed sudo attempts per server; failures are a small minority
+        Index(
+            "idx_sudo_events_failures",
+            "server_id",
+            desc("event_time"),
+            postgresql_where=text("success = false"),
+        ),
     )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, String, Text, desc, func, text
 from sqlalchemy.dialects.postgresql import INET
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -25,7 +25,7 @@ class UnreachableSource(Base):
     username: Mapped[str | None] = mapped_column(String(100))
     first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    event_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
     severity: Mapped[str] = mapped_column(String(20), nullable=False, default="high")
     notes: Mapped[str | None] = mapped_column(Text)
     acknowledged: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
@@ -35,11 +35,18 @@ class UnreachableSource(Base):
     )
 
     # Relationships
-    target_server: Mapped["Server"] = relationship()
-    ssh_key: Mapped["SSHKey | None"] = relationship()
-    acknowledged_user: Mapped["User | None"] = relationship()
+    target_server: Mapped["Server"] = relationship(lazy="raise")
+    ssh_key: Mapped["SSHKey | None"] = relationship(lazy="raise")
+    acknowledged_user: Mapped["User | None"] = relationship(lazy="raise")
 
     __table_args__ = (
         Index("idx_unreachable_source_ip", "source_ip"),
         Index("idx_unreachable_severity", "severity", "acknowledged"),
+        # Open alerts per server, newest first; most rows end up acknowledged
+        Index(
+            "idx_unreachable_target_open",
+            "target_server_id",
+            desc("last_seen_at"),
+            postgresql_where=text("acknowledged = false"),
+        ),
     )
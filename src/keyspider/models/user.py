@@ -25,4 +25,6 @@ class User(Base):
     )
 
     # Relationships
-    api_keys: Mapped[list["APIKey"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    api_keys: Mapped[list["APIKey"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan", lazy="raise"
+    )
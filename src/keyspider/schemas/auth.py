@@ -4,7 +4,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _canonical_permissions(v: object) -> object:
+    """Collapse duplicate permissions into an order-preserving tuple."""
+    if isinstance(v, (list, tuple)):
+        return tuple(dict.fromkeys(v))
+    return v
 
 
 class LoginRequest(BaseModel):
@@ -37,22 +44,28 @@ class UserCreate(BaseModel):
 
 
 class APIKeyCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
-    permissions: list[str] = ["read"]
+    permissions: tuple[str, ...] = ("read",)
     expires_in_days: int | None = None
 
+    normalize_permissions = field_validator("permissions", mode="before")(_canonical_permissions)
+
 
 class APIKeyResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: int
     key_prefix: str
     name: str
-    permissions: list[str]
+    permissions: tuple[str, ...]
     expires_at: datetime | None
     last_used_at: datetime | None
     created_at: datetime
 
+    normalize_permissions = field_validator("permissions", mode="before")(_canonical_permissions)
+
 
 class APIKeyCreated(APIKeyResponse):
     """Response when creating a new API key - includes the actual key (shown only once)."""
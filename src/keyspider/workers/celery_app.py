@@ -1,10 +1,110 @@
 """Celery application configuration."""
 
+import asyncio
+import logging
+import os
+import sys
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from keyspider.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Database connections opened by each worker process before its first task
+_PREWARM_CONNECTIONS = 5
+_PREWARM_TIMEOUT = 3.0
+
+
+def _green_threads_patched() -> bool:
+    """Whether a gevent or eventlet worker pool has monkey-patched this process."""
+    gevent_monkey = sys.modules.get("gevent.monkey")
+    if gevent_monkey is not None and gevent_monkey.is_module_patched("select"):
+        return True
+    eventlet_patcher = sys.modules.get("eventlet.patcher")
+    return eventlet_patcher is not None and eventlet_patcher.is_monkey_patched("select")
+
+
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
+
+def _new_loop() -> asyncio.AbstractEventLoop:
+    """Create a task loop, on uvloop for faster SSH, DNS and database socket I/O.
+
+    Only loops made here are affected; the global policy is left alone since
+    the API imports this module too. Green-thread pools (the watcher runs
+    -P gevent) need the stdlib loop, whose patched selector yields to the hub;
+    libuv would block every other green thread.
+    """
+    if uvloop is not None and not _green_threads_patched():
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+# Event loop reused by every task in a worker process, so database and SSH
+# connections bound to it survive between tasks. Recreated after a fork.
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_pid: int | None = None
+
+
+def run_async(coro):
+    """Run an async coroutine from a sync Celery task on the process loop."""
+    global _loop, _loop_pid
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        _loop = _new_loop()
+        _loop_pid = os.getpid()
+    if _loop.is_running():
+        # Another green thread in this process is driving the shared loop
+        loop = _new_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+    return _loop.run_until_complete(coro)
+
+
+async def _prewarm() -> None:
+    from sqlalchemy import text
+
+    from keyspider.db.session import engine
+
+    async def _touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held concurrently so the pool keeps that many connections open
+    await asyncio.gather(*(_touch() for _ in range(_PREWARM_CONNECTIONS)))
+
+
+@worker_process_init.connect
+def _prewarm_connections(**kwargs):
+    """Open pooled database connections on the process loop ahead of the first task."""
+    try:
+        run_async(asyncio.wait_for(_prewarm(), _PREWARM_TIMEOUT))
+    except Exception as e:
+        logger.warning("Connection pre-warm failed: %s", e)
+
+
+@worker_process_shutdown.connect
+def _close_loop(**kwargs):
+    """Release loop-bound connections and close the process loop."""
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        return
+    from keyspider.core.ssh_connector import get_ssh_pool
+    from keyspider.db.session import engine
+
+    try:
+        _loop.run_until_complete(get_ssh_pool().close_all())
+        _loop.run_until_complete(engine.dispose())
+    finally:
+        _loop.close()
+
+
 app = Celery(
     "keyspider",
     broker=settings.celery_broker_url,
@@ -12,9 +112,9 @@ app = Celery(
 )
 
 app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],  # json still accepted for messages queued before the switch
+    result_serializer="msgpack",
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
@@ -4,57 +4,57 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from celery import group
+from sqlalchemy import and_, func, select, update
 
-from keyspider.workers.celery_app import app
+from keyspider.workers.celery_app import app, run_async
 from keyspider.config import settings
-from keyspider.core.key_scanner import scan_server_keys
-from keyspider.core.log_parser import detect_log_paths, parse_log
+from keyspider.core.key_scanner import scan_server_keys, store_discovered_keys
+from keyspider.core.log_parser import detect_log_paths, parse_log_lines
 from keyspider.core.sftp_reader import SFTPReader
-from keyspider.core.ssh_connector import SSHConnectionPool, get_ssh_pool
-from keyspider.db.queries import get_or_create
-from keyspider.db.session import async_session_factory
-from keyspider.models.key_location import KeyLocation
+from keyspider.core.ssh_connector import get_ssh_pool
+from keyspider.db.session import async_session_factory, engine
+from keyspider.models.agent_status import AgentStatus
 from keyspider.models.scan_job import ScanJob
 from keyspider.models.server import Server
-from keyspider.models.ssh_key import SSHKey
 
 logger = logging.getLogger(__name__)
 
 
-def _run_async(coro):
-    """Run an async coroutine from a sync Celery task."""
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @app.task(bind=True, name="keyspider.workers.scan_tasks.scan_single_server")
 def scan_single_server(self, job_id: int, server_id: int):
     """Scan a single server for SSH keys and auth logs."""
-    return _run_async(_scan_single_server(self, job_id, server_id))
+    return run_async(_scan_single_server(self, job_id, server_id))
 
 
 async def _scan_single_server(task, job_id: int, server_id: int):
-    pool = SSHConnectionPool()
+    pool = get_ssh_pool()
     async with async_session_factory() as session:
-        # Update job status
-        result = await session.execute(select(ScanJob).where(ScanJob.id == job_id))
-        job = result.scalar_one_or_none()
-        if not job:
+        # Load the job, its server and any active agent in one round-trip
+        result = await session.execute(
+            select(ScanJob, Server, AgentStatus)
+            .outerjoin(Server, Server.id == server_id)
+            .outerjoin(
+                AgentStatus,
+                and_(
+                    AgentStatus.server_id == Server.id,
+                    AgentStatus.deployment_status == "active",
+                ),
+            )
+            .where(ScanJob.id == job_id)
+        )
+        row = result.first()
+        if not row:
             return {"error": "Job not found"}
+        job, server, agent = row
 
+        # Update job status
         job.status = "running"
         job.started_at = datetime.now(timezone.utc)
         await session.commit()
 
-        # Get server
-        result = await session.execute(select(Server).where(Server.id == server_id))
-        server = result.scalar_one_or_none()
         if not server:
             job.status = "failed"
             job.error_message = "Server not found"
@@ -63,14 +63,6 @@ async def _scan_single_server(task, job_id: int, server_id: int):
 
         # Check if agent is active for this server
         if server.prefer_agent:
-            from keyspider.models.agent_status import AgentStatus
-            result = await session.execute(
-                select(AgentStatus).where(
-                    AgentStatus.server_id == server.id,
-                    AgentStatus.deployment_status == "active",
-                )
-            )
-            agent = result.scalar_one_or_none()
             if agent and agent.last_heartbeat_at:
                 age = (datetime.now(timezone.utc) - agent.last_heartbeat_at).total_seconds()
                 if age < 300:
@@ -90,61 +82,29 @@ async def _scan_single_server(task, job_id: int, server_id: int):
 
                 # Scan keys via SFTP
                 keys = await scan_server_keys(conn, server.ip_address, server.ssh_port, server.os_type)
-                keys_stored = 0
-                for dk in keys:
-                    if not dk.fingerprint_sha256:
-                        continue
-                    ssh_key, created = await get_or_create(
-                        session, SSHKey,
-                        defaults={
-                            "fingerprint_md5": dk.fingerprint_md5,
-                            "key_type": dk.key_type or "unknown",
-                            "public_key_data": dk.public_key_data,
-                            "comment": dk.comment,
-                            "is_host_key": dk.is_host_key,
-                        },
-                        fingerprint_sha256=dk.fingerprint_sha256,
-                    )
-
-                    # Update file_mtime
-                    if dk.file_mtime:
-                        if ssh_key.file_mtime is None or dk.file_mtime < ssh_key.file_mtime:
-                            ssh_key.file_mtime = dk.file_mtime
-                        if ssh_key.file_mtime:
-                            ssh_key.estimated_age_days = (
-                                datetime.now(timezone.utc) - ssh_key.file_mtime
-                            ).days
-
-                    await get_or_create(
-                        session, KeyLocation,
-                        defaults={
-                            "file_type": dk.file_type,
-                            "unix_owner": dk.unix_owner,
-                            "unix_permissions": dk.unix_permissions,
-                            "file_mtime": dk.file_mtime,
-                            "file_size": dk.file_size,
-                            "last_verified_at": datetime.now(timezone.utc),
-                        },
-                        ssh_key_id=ssh_key.id,
-                        server_id=server.id,
-                        file_path=dk.file_path,
-                    )
-                    keys_stored += 1
+                keys_stored = await store_discovered_keys(session, server.id, keys)
 
                 # Parse auth logs via SFTP
                 events_parsed = 0
                 log_paths = detect_log_paths(server.os_type)
-                for log_path in log_paths:
+                # Probe every candidate at once rather than one round-trip each;
+                # the stat also supplies the reference time for parsing.
+                file_infos = await asyncio.gather(
+                    *(SFTPReader.stat_file(conn, log_path) for log_path in log_paths)
+                )
+                for log_path, file_info in zip(log_paths, file_infos):
+                    if not file_info or not file_info.size:
+                        continue
                     try:
-                        content = await SFTPReader.read_file_tail(
+                        lines = await SFTPReader.read_tail_lines(
                             conn, log_path,
                             max_lines=settings.log_max_lines_initial,
                         )
-                        if content:
-                            file_info = await SFTPReader.stat_file(conn, log_path)
-                            ref_time = file_info.mtime if file_info else None
-                            events = parse_log(content, server.os_type, ref_time)
-                            events_parsed = len(events)
+                        if lines is not None:
+                            # Only the count is needed; never materialize the events
+                            events_parsed = sum(
+                                1 for _ in parse_log_lines(lines, server.os_type, file_info.mtime)
+                            )
                             break
                     except Exception:
                         continue
@@ -174,14 +134,12 @@ async def _scan_single_server(task, job_id: int, server_id: int):
             await session.commit()
             logger.error("Scan failed for server %d: %s", server_id, e)
             return {"error": str(e)}
-        finally:
-            await pool.close_all()
 
 
 @app.task(name="keyspider.workers.scan_tasks.scheduled_full_scan")
 def scheduled_full_scan():
     """Scheduled task to scan all servers."""
-    return _run_async(_scheduled_full_scan())
+    return run_async(_scheduled_full_scan())
 
 
 async def _scheduled_full_scan():
@@ -197,40 +155,59 @@ async def _scheduled_full_scan():
 
         # Get all reachable servers
         result = await session.execute(
-            select(Server).where(Server.is_reachable.is_(True))
+            select(Server.id).where(Server.is_reachable.is_(True))
         )
-        servers = result.scalars().all()
+        server_ids = result.scalars().all()
 
-        # Launch individual scan tasks
-        for server in servers:
-            scan_single_server.delay(job.id, server.id)
+        job_id = job.id
 
-        return {"job_id": job.id, "servers_queued": len(servers)}
+    # Small fleets are scanned in this task; larger ones fan out over the broker
+    if len(server_ids) <= settings.scan_inline_max_servers:
+        sem = asyncio.Semaphore(settings.scan_concurrency)
+
+        async def _bounded(server_id: int):
+            async with sem:
+                return await _scan_single_server(None, job_id, server_id)
+
+        results = await asyncio.gather(
+            *(_bounded(sid) for sid in server_ids), return_exceptions=True
+        )
+        for sid, res in zip(server_ids, results):
+            if isinstance(res, Exception):
+                logger.error("Inline scan of server %d failed: %s", sid, res)
+    else:
+        # Publish the individual scan tasks to the broker in one batch
+        group(scan_single_server.s(job_id, server_id) for server_id in server_ids).apply_async()
+
+    return {"job_id": job_id, "servers_queued": len(server_ids)}
 
 
 @app.task(name="keyspider.workers.scan_tasks.check_agent_health")
 def check_agent_health():
     """Check agent heartbeats and mark stale agents as inactive."""
-    return _run_async(_check_agent_health())
+    return run_async(_check_agent_health())
 
 
 async def _check_agent_health():
-    from keyspider.models.agent_status import AgentStatus
-
     async with async_session_factory() as session:
+        checked = (await session.execute(
+            select(func.count()).where(AgentStatus.deployment_status == "active")
+        )).scalar() or 0
+
+        # Mark agents silent for over 5 minutes in one statement
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=300)
         result = await session.execute(
-            select(AgentStatus).where(AgentStatus.deployment_status == "active")
+            update(AgentStatus)
+            .where(
+                AgentStatus.deployment_status == "active",
+                AgentStatus.last_heartbeat_at < cutoff,
+            )
+            .values(deployment_status="inactive")
+            .returning(AgentStatus.id)
         )
-        agents = result.scalars().all()
-        now = datetime.now(timezone.utc)
-        stale_count = 0
-
-        for agent in agents:
-            if agent.last_heartbeat_at:
-                age = (now - agent.last_heartbeat_at).total_seconds()
-                if age > 300:  # 5 minutes
-                    agent.deployment_status = "inactive"
-                    stale_count += 1
+        stale_count = len(result.all())
 
         await session.commit()
-        return {"checked": len(agents), "stale": stale_count}
+        # The engine is shared by every task in this worker; report its pool
+        logger.debug("Database pool: %s", engine.pool.status())
+        return {"checked": checked, "stale": stale_count}
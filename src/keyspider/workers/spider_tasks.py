@@ -2,15 +2,14 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
 from datetime import datetime, timezone
 
 from sqlalchemy import select
 
-from keyspider.workers.celery_app import app
+from keyspider.workers.celery_app import app, run_async
 from keyspider.core.spider_engine import SpiderEngine
-from keyspider.core.ssh_connector import SSHConnectionPool
+from keyspider.core.ssh_connector import get_ssh_pool
 from keyspider.db.session import async_session_factory
 from keyspider.models.scan_job import ScanJob
 from keyspider.models.server import Server
@@ -18,22 +17,14 @@ from keyspider.models.server import Server
 logger = logging.getLogger(__name__)
 
 
-def _run_async(coro):
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @app.task(bind=True, name="keyspider.workers.spider_tasks.spider_crawl")
 def spider_crawl(self, job_id: int, seed_server_id: int, max_depth: int = 10):
     """Execute a spider crawl from a seed server."""
-    return _run_async(_spider_crawl(self, job_id, seed_server_id, max_depth))
+    return run_async(_spider_crawl(self, job_id, seed_server_id, max_depth))
 
 
 async def _spider_crawl(task, job_id: int, seed_server_id: int, max_depth: int):
-    pool = SSHConnectionPool()
+    pool = get_ssh_pool()
     async with async_session_factory() as session:
         # Update job status
         result = await session.execute(select(ScanJob).where(ScanJob.id == job_id))
@@ -101,5 +92,3 @@ async def _spider_crawl(task, job_id: int, seed_server_id: int, max_depth: int):
             await session.commit()
             logger.error("Spider crawl failed for job %d: %s", job_id, e)
             return {"error": str(e)}
-        finally:
-            await pool.close_all()
@@ -4,11 +4,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+import weakref
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
-from keyspider.workers.celery_app import app
+from keyspider.workers.celery_app import app, run_async
 from keyspider.core.log_parser import AuthEvent
 from keyspider.core.watcher import LogWatcher
 from keyspider.db.queries import get_or_create
@@ -20,22 +22,136 @@ from keyspider.models.watch_session import WatchSession
 
 logger = logging.getLogger(__name__)
 
-# Track active watchers by session ID
-_active_watchers: dict[int, LogWatcher] = {}
+# Track active watchers by session ID. Entries are held weakly, so a watcher
+# whose task has ended cannot linger here if the pop in its finally is missed.
+_active_watchers: weakref.WeakValueDictionary[int, LogWatcher] = weakref.WeakValueDictionary()
+
+# Watcher events are written in batches of up to _EVENT_BATCH_SIZE rows, or
+# after _EVENT_FLUSH_INTERVAL seconds, whichever comes first. The queue holds
+# per-read event lists and is bounded so a stalled database cannot grow it
+# without limit.
+_EVENT_BATCH_SIZE = 500
+_EVENT_FLUSH_INTERVAL = 0.1
+_EVENT_QUEUE_MAXSIZE = 1000
+
+# Resolved fingerprint -> key id and source IP -> server id, kept for
+# _ID_CACHE_TTL seconds so busy principals skip the lookups. Only hits are
+# cached so newly discovered keys and servers are picked up right away.
+_ID_CACHE_TTL = 300.0
+_ID_CACHE_MAX_SIZE = 10_000
+_key_id_cache: dict[str, tuple[int, float]] = {}
+_server_id_cache: dict[str, tuple[int, float]] = {}
+
+
+def _split_cached(
+    cache: dict[str, tuple[int, float]], wanted: set[str], now: float
+) -> tuple[dict[str, int], set[str]]:
+    """Return (cached ids, values still to look up) for ``wanted``."""
+    found: dict[str, int] = {}
+    missing: set[str] = set()
+    for value in wanted:
+        entry = cache.get(value)
+        if entry is not None and entry[1] > now:
+            found[value] = entry[0]
+        else:
+            missing.add(value)
+    return found, missing
+
+
+def _cache_id(cache: dict[str, tuple[int, float]], value: str, id_: int, expires: float) -> None:
+    if value not in cache and len(cache) >= _ID_CACHE_MAX_SIZE:
+        # Evict the oldest entry (dicts preserve insertion order)
+        cache.pop(next(iter(cache)))
+    cache[value] = (id_, expires)
+
+
+async def _persist_events(server_id: int, events: list[AuthEvent]) -> None:
+    """Resolve keys and source servers for a batch of events and insert them."""
+    now = time.monotonic()
+    expires = now + _ID_CACHE_TTL
+    key_ids, fingerprints = _split_cached(
+        _key_id_cache, {e.fingerprint for e in events if e.fingerprint}, now
+    )
+    server_ids, source_ips = _split_cached(_server_id_cache, {e.source_ip for e in events}, now)
 
+    async with async_session_factory() as session:
+        # Match fingerprints to keys
+        if fingerprints:
+            result = await session.execute(
+                select(SSHKey.fingerprint_sha256, SSHKey.id).where(
+                    SSHKey.fingerprint_sha256.in_(fingerprints)
+                )
+            )
+            for fingerprint, key_id in result.all():
+                key_ids[fingerprint] = key_id
+                _cache_id(_key_id_cache, fingerprint, key_id, expires)
+
+        # Match source IPs to servers
+        if source_ips:
+            result = await session.execute(
+                select(Server.ip_address, Server.id).where(Server.ip_address.in_(source_ips))
+            )
+            for ip, sid in result.all():
+                # asyncpg returns INET values as ipaddress objects
+                server_ids[str(ip)] = sid
+                _cache_id(_server_id_cache, str(ip), sid, expires)
+
+        await session.execute(
+            insert(AccessEvent),
+            [
+                {
+                    "target_server_id": server_id,
+                    "source_ip": event.source_ip,
+                    "source_server_id": server_ids.get(event.source_ip),
+                    "ssh_key_id": key_ids.get(event.fingerprint) if event.fingerprint else None,
+                    "fingerprint": event.fingerprint,
+                    "username": event.username,
+                    "auth_method": event.auth_method,
+                    "event_type": event.event_type,
+                    "event_time": event.timestamp,
+                    "raw_log_line": event.raw_line,
+                }
+                for event in events
+            ],
+        )
+        await session.commit()
+
+
+async def _write_events(server_id: int, queue: asyncio.Queue[list[AuthEvent] | None]) -> None:
+    """Drain watcher events from the queue and persist them in batches.
+
+    Runs until a ``None`` sentinel is received, flushing anything pending first.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = False
+
+    while not stopping:
+        first = await queue.get()
+        if first is None:
+            return
+
+        events = list(first)
+        deadline = loop.time() + _EVENT_FLUSH_INTERVAL
+        while len(events) < _EVENT_BATCH_SIZE:
+            try:
+                more = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if more is None:
+                stopping = True
+                break
+            events.extend(more)
 
-def _run_async(coro):
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+        try:
+            await _persist_events(server_id, events)
+        except Exception as e:
+            logger.error("Failed to store %d access events for server %d: %s", len(events), server_id, e)
 
 
 @app.task(bind=True, name="keyspider.workers.watch_tasks.start_watcher")
 def start_watcher(self, session_id: int):
     """Start a log watcher for a server."""
-    return _run_async(_start_watcher(self, session_id))
+    return run_async(_start_watcher(self, session_id))
 
 
 async def _start_watcher(task, session_id: int):
@@ -63,46 +179,25 @@ async def _start_watcher(task, session_id: int):
             os_type=server.os_type,
         )
 
-        async def on_event(event: AuthEvent):
-            """Handle a new auth event from the watcher."""
-            async with async_session_factory() as event_session:
-                # Match fingerprint to key
-                ssh_key_id = None
-                if event.fingerprint:
-                    key_result = await event_session.execute(
-                        select(SSHKey).where(
-                            SSHKey.fingerprint_sha256 == event.fingerprint
-                        )
-                    )
-                    key = key_result.scalar_one_or_none()
-                    if key:
-                        ssh_key_id = key.id
-
-                # Match source IP to server
-                source_server_id = None
-                src_result = await event_session.execute(
-                    select(Server).where(Server.ip_address == event.source_ip)
-                )
-                src_server = src_result.scalar_one_or_none()
-                if src_server:
-                    source_server_id = src_server.id
-
-                access_event = AccessEvent(
-                    target_server_id=server.id,
-                    source_ip=event.source_ip,
-                    source_server_id=source_server_id,
-                    ssh_key_id=ssh_key_id,
-                    fingerprint=event.fingerprint,
-                    username=event.username,
-                    auth_method=event.auth_method,
-                    event_type=event.event_type,
-                    event_time=event.timestamp,
-                    raw_log_line=event.raw_line,
+        event_queue: asyncio.Queue[list[AuthEvent] | None] = asyncio.Queue(
+            maxsize=_EVENT_QUEUE_MAXSIZE
+        )
+
+        # The callback lives as long as the watcher; keep it off the ORM objects
+        hostname = server.hostname
+
+        def on_events(events: list[AuthEvent]):
+            """Hand a batch of new auth events to the writer task."""
+            try:
+                event_queue.put_nowait(events)
+            except asyncio.QueueFull:
+                logger.warning(
+                    "Dropping %d access events for %s: event writer is behind",
+                    len(events), hostname,
                 )
-                event_session.add(access_event)
-                await event_session.commit()
 
-        watcher.on_event(lambda e: asyncio.create_task(on_event(e)))
+        watcher.on_events(on_events)
+        writer = asyncio.create_task(_write_events(server.id, event_queue))
         _active_watchers[session_id] = watcher
 
         watch.status = "active"
@@ -117,12 +212,14 @@ async def _start_watcher(task, session_id: int):
             raise
         finally:
             _active_watchers.pop(session_id, None)
+            await event_queue.put(None)
+            await writer
 
 
 @app.task(name="keyspider.workers.watch_tasks.stop_watcher")
 def stop_watcher(session_id: int):
     """Stop a running watcher."""
-    return _run_async(_stop_watcher(session_id))
+    return run_async(_stop_watcher(session_id))
 
 
 async def _stop_watcher(session_id: int):
@@ -147,7 +244,7 @@ async def _stop_watcher(session_id: int):
 @app.task(name="keyspider.workers.watch_tasks.health_check_watchers")
 def health_check_watchers():
     """Periodic health check for all active watchers."""
-    return _run_async(_health_check())
+    return run_async(_health_check())
 
 
 async def _health_check():
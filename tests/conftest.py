@@ -7,45 +7,64 @@ from pathlib import Path
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import String, event
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import INET, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
 
 from keyspider.db.session import Base
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
+
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop when it is installed, like the workers do."""
+    if uvloop is None:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+
 # Use an in-memory SQLite database for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
-# Make PostgreSQL-specific types work with SQLite for testing
-from sqlalchemy import JSON
-from sqlalchemy.dialects.postgresql import INET, JSONB
+# Make PostgreSQL-specific types work with SQLite for testing. The types are
+# only rendered differently in SQLite DDL; the shared metadata is untouched.
+@compiles(INET, "sqlite")
+def _compile_inet_sqlite(type_, compiler, **kw):
+    return "VARCHAR(45)"
 
 
-@event.listens_for(Base.metadata, "before_create")
-def _patch_pg_types_for_sqlite(target, connection, **kw):
-    """Replace PostgreSQL-specific column types with SQLite-compatible ones."""
-    if connection.dialect.name == "sqlite":
-        for table in target.tables.values():
-            for column in table.columns:
-                if isinstance(column.type, INET):
-                    column.type = String(45)
-                elif isinstance(column.type, JSONB):
-                    column.type = JSON()
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+@pytest_asyncio.fixture(scope="session")
+async def db_engine():
+    """Create the test database once per run.
 
+    A single in-memory connection is shared through StaticPool; each test
+    works inside its own outer transaction that is rolled back afterwards.
+    Under pytest-xdist every worker is a separate process and so gets its own
+    private database.
+    """
+    engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=StaticPool)
 
-@pytest_asyncio.fixture
-async def db_session():
-    """Create a test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    # Let SQLAlchemy drive transactions so SAVEPOINTs work with pysqlite
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
     # Import all models to register them
     import keyspider.models  # noqa: F401
@@ -53,25 +72,47 @@ async def db_session():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with session_factory() as session:
-        yield session
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    yield engine
     await engine.dispose()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
+async def db_session(db_engine):
+    """Create a test database session rolled back after the test.
+
+    Commits inside the test release a SAVEPOINT rather than the outer
+    transaction, so nothing persists between tests.
+    """
+    async with db_engine.connect() as conn:
+        await conn.begin()
+        session = AsyncSession(
+            bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await conn.rollback()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI application, imported only by tests that make HTTP calls."""
+    from keyspider.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
 def sample_auth_log_debian():
     return (FIXTURES_DIR / "sample_auth_log_debian.txt").read_text()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_auth_log_rhel():
     return (FIXTURES_DIR / "sample_auth_log_rhel.txt").read_text()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_syslog_aix():
     return (FIXTURES_DIR / "sample_syslog_aix.txt").read_text()
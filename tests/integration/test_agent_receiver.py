@@ -4,115 +4,76 @@ import hashlib
 import secrets
 
 import pytest
+import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import JSON, String
-from sqlalchemy.dialects.postgresql import INET, JSONB
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import select
 
-from keyspider.main import app
 from keyspider.dependencies import get_db
-from keyspider.db.session import Base
+from keyspider.models.access_event import AccessEvent
 from keyspider.models.agent_status import AgentStatus
+from keyspider.models.key_location import KeyLocation
 from keyspider.models.server import Server
+from keyspider.models.ssh_key import SSHKey
+from keyspider.models.sudo_event import SudoEvent
 
 
-@pytest.mark.asyncio
-async def test_heartbeat_valid_token():
-    """Test heartbeat endpoint with valid agent token."""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
-
-    import keyspider.models  # noqa: F401
-
-    for table in Base.metadata.tables.values():
-        for column in table.columns:
-            if isinstance(column.type, INET):
-                column.type = String(45)
-            elif isinstance(column.type, JSONB):
-                column.type = JSON()
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    token = secrets.token_urlsafe(32)
-    token_hash = hashlib.sha256(token.encode()).hexdigest()
-
-    async with session_factory() as session:
-        server = Server(hostname="recv-test", ip_address="10.0.0.1", ssh_port=22, os_type="linux")
-        session.add(server)
-        await session.flush()
-
-        agent = AgentStatus(
-            server_id=server.id,
-            deployment_status="active",
-            agent_token_hash=token_hash,
-            agent_version="1.0.0",
-        )
-        session.add(agent)
-        await session.commit()
-        server_id = server.id
+@pytest_asyncio.fixture
+async def client(db_session, app):
+    """HTTP client whose requests share the test's database session."""
 
     async def _override_get_db():
-        async with session_factory() as session:
-            yield session
+        yield db_session
 
     app.dependency_overrides[get_db] = _override_get_db
     try:
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as client:
-            response = await client.post(
-                "/api/agent/heartbeat",
-                json={"server_id": server_id, "agent_version": "1.0.0"},
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            assert response.status_code == 200
-            assert response.json()["status"] == "ok"
+            yield client
     finally:
         app.dependency_overrides.clear()
-        await engine.dispose()
 
 
-@pytest.mark.asyncio
-async def test_heartbeat_invalid_token():
-    """Test heartbeat endpoint with invalid token returns 401."""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
-
-    import keyspider.models  # noqa: F401
+async def _create_agent(db_session, hostname: str, ip_address: str) -> tuple[int, str]:
+    """Create a server with an active agent; return (server_id, token)."""
+    token = secrets.token_urlsafe(32)
+    server = Server(hostname=hostname, ip_address=ip_address, ssh_port=22, os_type="linux")
+    db_session.add(AgentStatus(
+        server=server,
+        deployment_status="active",
+        agent_token_hash=hashlib.sha256(token.encode()).hexdigest(),
+        agent_version="1.0.0",
+    ))
+    await db_session.commit()
+    return server.id, token
 
-    for table in Base.metadata.tables.values():
-        for column in table.columns:
-            if isinstance(column.type, INET):
-                column.type = String(45)
-            elif isinstance(column.type, JSONB):
-                column.type = JSON()
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+@pytest.mark.asyncio
+async def test_heartbeat_valid_token(db_session, client):
+    """Test heartbeat endpoint with valid agent token."""
+    server_id, token = await _create_agent(db_session, "recv-test", "10.0.0.1")
 
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    response = await client.post(
+        "/api/agent/heartbeat",
+        json={"server_id": server_id, "agent_version": "1.0.0"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
 
-    async def _override_get_db():
-        async with session_factory() as session:
-            yield session
 
-    app.dependency_overrides[get_db] = _override_get_db
-    try:
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as client:
-            response = await client.post(
-                "/api/agent/heartbeat",
-                json={"server_id": 1, "agent_version": "1.0.0"},
-                headers={"Authorization": "Bearer invalid-token"},
-            )
-            assert response.status_code == 401
-    finally:
-        app.dependency_overrides.clear()
-        await engine.dispose()
+@pytest.mark.asyncio
+async def test_heartbeat_invalid_token(client):
+    """Test heartbeat endpoint with invalid token returns 401."""
+    response = await client.post(
+        "/api/agent/heartbeat",
+        json={"server_id": 1, "agent_version": "1.0.0"},
+        headers={"Authorization": "Bearer invalid-token"},
+    )
+    assert response.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_heartbeat_missing_token():
+async def test_heartbeat_missing_token(app):
     """Test heartbeat endpoint with missing token returns 401."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -121,3 +82,49 @@ async def test_heartbeat_missing_token():
             json={"server_id": 1, "agent_version": "1.0.0"},
         )
         assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_events_and_keys_ingest(db_session, client):
+    """Test that event and key payloads are stored in bulk."""
+    server_id, token = await _create_agent(db_session, "ingest-test", "10.0.0.1")
+
+    key_data = "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIAABAgMEBQYHCAkKCwwNDg8QERITFBUWFxgZGhscHR4f user@host"
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post("/api/agent/events", headers=headers, json={
+        "server_id": server_id,
+        "events": [
+            {"timestamp": "2026-01-01T00:00:00+00:00", "source_ip": "10.0.0.1",
+             "username": "root", "event_type": "accepted"},
+            {"timestamp": "bogus", "source_ip": "10.0.0.9",
+             "username": "deploy", "event_type": "failed"},
+        ],
+    })
+    assert response.json()["events_received"] == 2
+
+    response = await client.post("/api/agent/sudo-events", headers=headers, json={
+        "server_id": server_id,
+        "events": [{"timestamp": "2026-01-01T00:00:00+00:00", "username": "deploy",
+                    "command": "/bin/ls", "success": False}],
+    })
+    assert response.json()["events_received"] == 1
+
+    item = {"public_key_data": key_data, "file_type": "authorized_keys"}
+    response = await client.post("/api/agent/keys", headers=headers, json={
+        "server_id": server_id,
+        "keys": [
+            {**item, "file_path": "/root/.ssh/authorized_keys"},
+            {**item, "file_path": "/home/deploy/.ssh/authorized_keys"},
+            {**item, "public_key_data": " ", "file_path": "/tmp/empty"},
+        ],
+    })
+    assert response.json()["keys_stored"] == 2
+
+    events = (await db_session.execute(select(AccessEvent).order_by(AccessEvent.id))).scalars().all()
+    assert [e.source_server_id for e in events] == [server_id, None]
+    assert all(e.log_source == "agent" for e in events)
+    sudo = (await db_session.execute(select(SudoEvent))).scalar_one()
+    assert sudo.success is False
+    assert len((await db_session.execute(select(SSHKey))).scalars().all()) == 1
+    assert len((await db_session.execute(select(KeyLocation))).scalars().all()) == 2
@@ -1,104 +1,179 @@
 """Integration tests for the API endpoints."""
 
 import pytest
+import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import JSON, String
-from sqlalchemy.dialects.postgresql import INET, JSONB
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import select
 
-from keyspider.main import app
 from keyspider.dependencies import get_db
-from keyspider.db.session import Base
 
 
-async def _override_get_db():
-    """Provide a SQLite test database session for API tests."""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
-
-    import keyspider.models  # noqa: F401
+@pytest_asyncio.fixture(scope="session")
+async def api_client(app):
+    """One HTTP client for the whole run; dependency overrides stay per-test."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
 
-    # Apply INET/JSONB -> String/JSON fix for SQLite
-    for table in Base.metadata.tables.values():
-        for column in table.columns:
-            if isinstance(column.type, INET):
-                column.type = String(45)
-            elif isinstance(column.type, JSONB):
-                column.type = JSON()
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+@pytest.fixture
+def override_db(app, db_session):
+    """Serve requests from the test's database session."""
 
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with session_factory() as session:
-        yield session
+    async def _override_get_db():
+        yield db_session
 
-    await engine.dispose()
+    app.dependency_overrides[get_db] = _override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
 
 
 @pytest.mark.asyncio
-async def test_health_check():
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        response = await client.get("/health")
-        assert response.status_code == 200
-        assert response.json() == {"status": "ok"}
+async def test_health_check(api_client):
+    response = await api_client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
 
 
 @pytest.mark.asyncio
-async def test_login_required():
+async def test_login_required(api_client):
     """Verify that API endpoints require authentication."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        response = await client.get("/api/servers")
-        assert response.status_code == 401
+    response = await api_client.get("/api/servers")
+    assert response.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_login_invalid_credentials():
-    app.dependency_overrides[get_db] = _override_get_db
-    try:
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as client:
-            response = await client.post("/api/auth/login", json={
-                "username": "nonexistent",
-                "password": "wrong",
-            })
-            assert response.status_code == 401
-    finally:
-        app.dependency_overrides.clear()
+async def test_login_invalid_credentials(db_session, api_client, override_db):
+    response = await api_client.post("/api/auth/login", json={
+        "username": "nonexistent",
+        "password": "wrong",
+    })
+    assert response.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_agents_endpoint_requires_auth():
+async def test_agents_endpoint_requires_auth(api_client):
     """Verify that the agents endpoint requires authentication."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        response = await client.get("/api/agents")
-        assert response.status_code == 401
+    response = await api_client.get("/api/agents")
+    assert response.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_reports_dormant_keys_requires_auth():
+async def test_reports_dormant_keys_requires_auth(api_client):
     """Verify that dormant keys report requires authentication."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        response = await client.get("/api/reports/dormant-keys")
-        assert response.status_code == 401
+    response = await api_client.get("/api/reports/dormant-keys")
+    assert response.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_reports_mystery_keys_requires_auth():
+async def test_reports_mystery_keys_requires_auth(api_client):
     """Verify that mystery keys report requires authentication."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        response = await client.get("/api/reports/mystery-keys")
-        assert response.status_code == 401
+    response = await api_client.get("/api/reports/mystery-keys")
+    assert response.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_graph_layered_requires_auth():
+async def test_graph_layered_requires_auth(api_client):
     """Verify that layered graph endpoint requires authentication."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
-        response = await client.get("/api/graph/layered")
+    response = await api_client.get("/api/graph/layered")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_api_key_authentication(db_session, api_client, override_db):
+    """An issued API key authenticates; a tampered key with the same prefix does not."""
+    from keyspider.api.auth import _create_access_token
+    from keyspider.dependencies import flush_api_key_usage
+    from keyspider.models.api_key import APIKey
+    from keyspider.models.user import User
+
+    user = User(username="keyuser", password_hash="unused", role="viewer")
+    db_session.add(user)
+    await db_session.commit()
+    user_id = user.id
+
+    jwt_headers = {"Authorization": f"Bearer {_create_access_token(user_id)}"}
+    response = await api_client.post(
+        "/api/auth/api-keys", json={"name": "ci"}, headers=jwt_headers
+    )
+    assert response.status_code == 200
+    raw_key = response.json()["key"]
+
+    response = await api_client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {raw_key}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["username"] == "keyuser"
+
+    tampered = raw_key[:-1] + ("A" if raw_key[-1] != "A" else "B")
+    response = await api_client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {tampered}"}
+    )
+    assert response.status_code == 401
+
+    # Usage is buffered, then written in one batch
+    assert await flush_api_key_usage(db_session) == 1
+    result = await db_session.execute(select(APIKey).where(APIKey.user_id == user_id))
+    assert result.scalar_one().last_used_at is not None
+
+
+@pytest.mark.asyncio
+async def test_legacy_bcrypt_api_key_is_rehashed(db_session, api_client, override_db):
+    """A key stored with the old bcrypt hash still works and is upgraded on use."""
+    import bcrypt
+
+    from keyspider.models.api_key import API_KEY_PREFIX_LENGTH, APIKey, hash_api_key
+    from keyspider.models.user import User
+
+    user = User(username="legacykey", password_hash="unused", role="viewer")
+    db_session.add(user)
+    await db_session.flush()
+    raw_key = "legacy-api-key-" + "x" * 49
+    api_key = APIKey(
+        user_id=user.id,
+        key_hash=bcrypt.hashpw(raw_key.encode(), bcrypt.gensalt(rounds=4)).decode(),
+        key_prefix=raw_key[:API_KEY_PREFIX_LENGTH],
+        name="old",
+    )
+    db_session.add(api_key)
+    await db_session.commit()
+
+    for wrong in (raw_key[:-1] + "y", raw_key + "z" * 20):
+        response = await api_client.get(
+            "/api/auth/me", headers={"Authorization": f"Bearer {wrong}"}
+        )
         assert response.status_code == 401
+    assert api_key.key_hash.startswith("$2")
+
+    response = await api_client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {raw_key}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["username"] == "legacykey"
+    assert api_key.key_hash == hash_api_key(raw_key)
+
+
+@pytest.mark.asyncio
+async def test_delete_server_cascades_key_locations(db_session, api_client, override_db):
+    from keyspider.api.auth import _create_access_token
+    from keyspider.models.key_location import KeyLocation
+    from keyspider.models.server import Server
+    from keyspider.models.ssh_key import SSHKey
+    from keyspider.models.user import User
+
+    user = User(username="operator", password_hash="unused", role="operator")
+    server = Server(hostname="doomed", ip_address="10.9.9.9")
+    key = SSHKey(fingerprint_sha256="SHA256:doomed", key_type="rsa")
+    db_session.add_all([user, server, key, KeyLocation(
+        ssh_key=key, server=server,
+        file_path="/root/.ssh/authorized_keys", file_type="authorized_keys",
+    )])
+    await db_session.commit()
+    user_id, server_id = user.id, server.id
+
+    headers = {"Authorization": f"Bearer {_create_access_token(user_id)}"}
+    response = await api_client.delete(f"/api/servers/{server_id}", headers=headers)
+    assert response.status_code == 200
+
+    result = await db_session.execute(select(KeyLocation))
+    assert result.scalars().all() == []
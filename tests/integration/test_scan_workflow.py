@@ -1,8 +1,15 @@
 """Integration tests for the scan workflow."""
 
+import contextlib
+
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
 
+from keyspider.core.key_scanner import DiscoveredKey, store_discovered_keys
+from keyspider.core.log_parser import AuthEvent
+from keyspider.models.access_event import AccessEvent
 from keyspider.models.server import Server
 from keyspider.models.scan_job import ScanJob
 from keyspider.models.ssh_key import SSHKey
@@ -10,6 +17,13 @@ from keyspider.models.key_location import KeyLocation
 from keyspider.models.access_path import AccessPath
 from keyspider.models.agent_status import AgentStatus
 from keyspider.models.sudo_event import SudoEvent
+from keyspider.workers import scan_tasks, watch_tasks
+
+_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _mkserver(hostname: str, ip: str, *, ssh_port: int = 22, os_type: str = "linux") -> Server:
+    return Server(hostname=hostname, ip_address=ip, ssh_port=ssh_port, os_type=os_type)
 
 
 class TestScanWorkflow:
@@ -42,32 +56,21 @@ class TestScanWorkflow:
 
     @pytest.mark.asyncio
     async def test_create_ssh_key_and_location(self, db_session):
-        server = Server(
-            hostname="key-test-server",
-            ip_address="10.0.0.2",
-            ssh_port=22,
-            os_type="linux",
-        )
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("key-test-server", "10.0.0.2")
         key = SSHKey(
             fingerprint_sha256="SHA256:testfp1234567890",
             key_type="rsa",
             key_bits=4096,
         )
-        db_session.add(key)
-        await db_session.flush()
-
         location = KeyLocation(
-            ssh_key_id=key.id,
-            server_id=server.id,
+            ssh_key=key,
+            server=server,
             file_path="/root/.ssh/authorized_keys",
             file_type="authorized_keys",
             unix_owner="root",
             unix_permissions="0600",
         )
-        db_session.add(location)
+        db_session.add_all([server, key, location])
         await db_session.commit()
 
         assert location.id is not None
@@ -78,12 +81,7 @@ class TestScanWorkflow:
 class TestNewModelFields:
     @pytest.mark.asyncio
     async def test_server_scan_watermark(self, db_session):
-        server = Server(
-            hostname="watermark-test",
-            ip_address="10.0.10.1",
-            ssh_port=22,
-            os_type="linux",
-        )
+        server = _mkserver("watermark-test", "10.0.10.1")
         db_session.add(server)
         await db_session.commit()
 
@@ -94,12 +92,7 @@ class TestNewModelFields:
 
     @pytest.mark.asyncio
     async def test_server_prefer_agent(self, db_session):
-        server = Server(
-            hostname="agent-pref-test",
-            ip_address="10.0.10.2",
-            ssh_port=22,
-            os_type="linux",
-        )
+        server = _mkserver("agent-pref-test", "10.0.10.2")
         db_session.add(server)
         await db_session.commit()
         assert server.prefer_agent is False
@@ -110,64 +103,49 @@ class TestNewModelFields:
 
     @pytest.mark.asyncio
     async def test_key_location_graph_layer(self, db_session):
-        server = Server(hostname="gl-test", ip_address="10.0.10.3", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("gl-test", "10.0.10.3")
         key = SSHKey(fingerprint_sha256="SHA256:gl_test_fp", key_type="ed25519")
-        db_session.add(key)
-        await db_session.flush()
-
         loc = KeyLocation(
-            ssh_key_id=key.id,
-            server_id=server.id,
+            ssh_key=key,
+            server=server,
             file_path="/root/.ssh/authorized_keys",
             file_type="authorized_keys",
         )
-        db_session.add(loc)
+        db_session.add_all([server, key, loc])
         await db_session.commit()
         assert loc.graph_layer == "authorization"
 
     @pytest.mark.asyncio
     async def test_key_location_file_mtime(self, db_session):
-        server = Server(hostname="mt-test", ip_address="10.0.10.4", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("mt-test", "10.0.10.4")
         key = SSHKey(fingerprint_sha256="SHA256:mt_test_fp", key_type="rsa")
-        db_session.add(key)
-        await db_session.flush()
-
         mtime = datetime(2023, 6, 15, tzinfo=timezone.utc)
         loc = KeyLocation(
-            ssh_key_id=key.id,
-            server_id=server.id,
+            ssh_key=key,
+            server=server,
             file_path="/root/.ssh/authorized_keys",
             file_type="authorized_keys",
             file_mtime=mtime,
             file_size=2048,
         )
-        db_session.add(loc)
+        db_session.add_all([server, key, loc])
         await db_session.commit()
         assert loc.file_mtime == mtime
         assert loc.file_size == 2048
 
     @pytest.mark.asyncio
     async def test_access_path_authorization_flags(self, db_session):
-        server = Server(hostname="ap-test", ip_address="10.0.10.5", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("ap-test", "10.0.10.5")
         path = AccessPath(
-            target_server_id=server.id,
+            target_server=server,
             username="root",
             event_count=3,
             is_active=True,
             is_authorized=True,
             is_used=False,
-            first_seen_at=datetime.now(timezone.utc), last_seen_at=datetime.now(timezone.utc),
+            first_seen_at=_NOW, last_seen_at=_NOW,
         )
-        db_session.add(path)
+        db_session.add_all([server, path])
         await db_session.commit()
         assert path.is_authorized is True
         assert path.is_used is False
@@ -190,17 +168,14 @@ class TestNewModelFields:
 class TestAgentStatusModel:
     @pytest.mark.asyncio
     async def test_create_agent_status(self, db_session):
-        server = Server(hostname="as-test", ip_address="10.0.11.1", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("as-test", "10.0.11.1")
         agent = AgentStatus(
-            server_id=server.id,
+            server=server,
             deployment_status="active",
             agent_version="1.0.0",
             agent_token_hash="sha256hashhere",
         )
-        db_session.add(agent)
+        db_session.add_all([server, agent])
         await db_session.commit()
         assert agent.id is not None
         assert agent.deployment_status == "active"
@@ -208,46 +183,168 @@ class TestAgentStatusModel:
 
     @pytest.mark.asyncio
     async def test_agent_status_heartbeat(self, db_session):
-        server = Server(hostname="hb-test", ip_address="10.0.11.2", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("hb-test", "10.0.11.2")
         agent = AgentStatus(
-            server_id=server.id,
+            server=server,
             deployment_status="deploying",
             agent_token_hash="token_hash_2",
         )
-        db_session.add(agent)
+        db_session.add_all([server, agent])
         await db_session.commit()
 
-        agent.last_heartbeat_at = datetime.now(timezone.utc)
+        agent.last_heartbeat_at = _NOW
         agent.deployment_status = "active"
         await db_session.commit()
         assert agent.last_heartbeat_at is not None
         assert agent.deployment_status == "active"
 
+    @pytest.mark.asyncio
+    async def test_check_agent_health_marks_stale(self, db_session, monkeypatch):
+        now = datetime.now(timezone.utc)
+        heartbeats = {"fresh": now, "stale": now - timedelta(minutes=10), "never": None}
+        for i, (name, heartbeat) in enumerate(heartbeats.items()):
+            server = Server(hostname=f"health-{name}", ip_address=f"10.0.11.{10 + i}")
+            db_session.add(AgentStatus(
+                server=server,
+                deployment_status="active",
+                agent_token_hash=f"health_{name}",
+                last_heartbeat_at=heartbeat,
+            ))
+        await db_session.commit()
+
+        @contextlib.asynccontextmanager
+        async def _session_factory():
+            yield db_session
+
+        monkeypatch.setattr(scan_tasks, "async_session_factory", _session_factory)
+        assert await scan_tasks._check_agent_health() == {"checked": 3, "stale": 1}
+
+        result = await db_session.execute(
+            select(AgentStatus.agent_token_hash).where(AgentStatus.deployment_status == "inactive")
+        )
+        assert result.scalars().all() == ["health_stale"]
+
 
 class TestSudoEventModel:
     @pytest.mark.asyncio
     async def test_create_sudo_event(self, db_session):
-        server = Server(hostname="sudo-test", ip_address="10.0.12.1", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
+        server = _mkserver("sudo-test", "10.0.12.1")
         event = SudoEvent(
-            server_id=server.id,
+            server=server,
             username="admin",
             command="/usr/bin/apt update",
             target_user="root",
             working_dir="/home/admin",
             tty="pts/0",
-            event_time=datetime.now(timezone.utc),
+            event_time=_NOW,
             success=True,
             raw_log_line="Jan 5 10:00:00 host sudo[1]: admin : TTY=pts/0 ; ...",
         )
-        db_session.add(event)
+        db_session.add_all([server, event])
         await db_session.commit()
         assert event.id is not None
         assert event.username == "admin"
         assert event.command == "/usr/bin/apt update"
         assert event.success is True
+
+
+class TestStoreDiscoveredKeys:
+    @staticmethod
+    def _key(fp, path, mtime=None, owner="root"):
+        return DiscoveredKey(
+            fingerprint_sha256=fp,
+            fingerprint_md5=None,
+            key_type="ssh-ed25519",
+            public_key_data="AAAA",
+            comment=None,
+            file_path=path,
+            file_type="authorized_keys",
+            unix_owner=owner,
+            unix_permissions="0600",
+            file_mtime=mtime,
+        )
+
+    @pytest.mark.asyncio
+    async def test_inserts_keys_and_locations(self, db_session):
+        server = _mkserver("store-test", "10.0.13.1")
+        db_session.add(server)
+        await db_session.flush()
+
+        old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        new = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        keys = [
+            self._key("SHA256:a", "/root/.ssh/authorized_keys", new),
+            self._key("SHA256:a", "/home/bob/.ssh/authorized_keys", old),
+            self._key("SHA256:b", "/root/.ssh/authorized_keys"),
+            self._key(None, "/root/.ssh/broken"),
+        ]
+        assert await store_discovered_keys(db_session, server.id, keys) == 3
+
+        result = await db_session.execute(select(SSHKey).order_by(SSHKey.fingerprint_sha256))
+        stored = result.scalars().all()
+        assert [k.fingerprint_sha256 for k in stored] == ["SHA256:a", "SHA256:b"]
+        assert stored[0].file_mtime.replace(tzinfo=timezone.utc) == old
+
+        result = await db_session.execute(select(func.count()).select_from(KeyLocation))
+        assert result.scalar() == 3
+
+    @pytest.mark.asyncio
+    async def test_rescan_updates_existing_locations(self, db_session):
+        server = _mkserver("rescan-test", "10.0.13.2")
+        db_session.add(server)
+        await db_session.flush()
+
+        path = "/root/.ssh/authorized_keys"
+        await store_discovered_keys(db_session, server.id, [self._key("SHA256:c", path)])
+        await store_discovered_keys(db_session, server.id, [self._key("SHA256:c", path, owner="admin")])
+
+        result = await db_session.execute(select(KeyLocation.unix_owner))
+        assert result.scalars().all() == ["admin"]
+        result = await db_session.execute(select(func.count()).select_from(SSHKey))
+        assert result.scalar() == 1
+
+
+class TestPersistWatchEvents:
+    @pytest.mark.asyncio
+    async def test_resolves_and_caches_ids(self, db_session, monkeypatch):
+        source = Server(hostname="watch-src", ip_address="10.0.14.1")
+        target = Server(hostname="watch-dst", ip_address="10.0.14.2")
+        key = SSHKey(fingerprint_sha256="SHA256:watch", key_type="ed25519")
+        db_session.add_all([source, target, key])
+        await db_session.commit()
+
+        @contextlib.asynccontextmanager
+        async def _session_factory():
+            yield db_session
+
+        monkeypatch.setattr(watch_tasks, "async_session_factory", _session_factory)
+        monkeypatch.setattr(watch_tasks, "_key_id_cache", {})
+        monkeypatch.setattr(watch_tasks, "_server_id_cache", {})
+
+        def _event(ip, fingerprint):
+            return AuthEvent(
+                timestamp=_NOW, source_ip=ip, username="root",
+                auth_method="publickey", event_type="accepted", fingerprint=fingerprint,
+                port=22, pid=1, raw_line="line",
+            )
+
+        await watch_tasks._persist_events(
+            target.id, [_event("10.0.14.1", "SHA256:watch"), _event("10.0.14.9", None)]
+        )
+
+        result = await db_session.execute(select(AccessEvent).order_by(AccessEvent.id))
+        events = result.scalars().all()
+        assert [(e.source_server_id, e.ssh_key_id) for e in events] == [
+            (source.id, key.id), (None, None),
+        ]
+        assert set(watch_tasks._key_id_cache) == {"SHA256:watch"}
+        assert set(watch_tasks._server_id_cache) == {"10.0.14.1"}
+
+    def test_id_cache_is_bounded(self, monkeypatch):
+        cache: dict[str, tuple[int, float]] = {}
+        monkeypatch.setattr(watch_tasks, "_ID_CACHE_MAX_SIZE", 2)
+        for i, value in enumerate(["a", "b", "c"]):
+            watch_tasks._cache_id(cache, value, i, 100.0)
+        assert list(cache) == ["b", "c"]
+        assert watch_tasks._split_cached(cache, {"b", "z"}, 50.0) == ({"b": 1}, {"z"})
+        assert watch_tasks._split_cached(cache, {"b"}, 150.0) == ({}, {"b"})
@@ -1,27 +1,19 @@
 """Tests for the agent manager."""
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock
 from datetime import datetime, timezone, timedelta
 
+from keyspider.core import agent_manager
 from keyspider.core.agent_manager import AgentManager, _SYSTEMD_UNIT
 
+# These tests never touch SSH, so the manager only needs a pool reference
+_POOL_STUB = object()
 
-class TestAgentManagerRender:
-    def test_render_systemd_unit(self):
-        pool = MagicMock()
-        manager = AgentManager(pool)
-        unit = manager._render_systemd_unit()
-        assert "[Unit]" in unit
-        assert "keyspider-agent" in unit
-        assert "ExecStart" in unit
+_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
-    def test_render_agent_injects_config(self):
-        pool = MagicMock()
-        manager = AgentManager(pool)
-
-        # Mock the agent template file
-        template = '''#!/usr/bin/env python3
+# Stand-in for the agent script read from _AGENT_SCRIPT_PATH
+_AGENT_TEMPLATE = '''#!/usr/bin/env python3
 """Keyspider Agent."""
 
 CONFIG = {
@@ -37,9 +29,28 @@ CONFIG = {
 class Agent:
     pass
 '''
-        with patch("keyspider.core.agent_manager._AGENT_SCRIPT_PATH") as mock_path:
-            mock_path.read_text.return_value = template
-            rendered = manager._render_agent("https://keyspider.example.com", 42, "test-token-xyz")
+
+
+class _TemplatePath:
+    """Stands in for _AGENT_SCRIPT_PATH, which the manager only reads."""
+
+    def read_text(self, *args, **kwargs):
+        return _AGENT_TEMPLATE
+
+
+class TestAgentManagerRender:
+    def test_render_systemd_unit(self):
+        manager = AgentManager(_POOL_STUB)
+        unit = manager._render_systemd_unit()
+        assert "[Unit]" in unit
+        assert "keyspider-agent" in unit
+        assert "ExecStart" in unit
+
+    def test_render_agent_injects_config(self, monkeypatch):
+        manager = AgentManager(_POOL_STUB)
+        monkeypatch.setattr(agent_manager, "_AGENT_SCRIPT_PATH", _TemplatePath())
+
+        rendered = manager._render_agent("https://keyspider.example.com", 42, "test-token-xyz")
 
         assert '"api_url": "https://keyspider.example.com"' in rendered
         assert '"server_id": 42' in rendered
@@ -56,21 +67,17 @@ class TestAgentManagerHealthCheck:
         server = Server(
             hostname="agent-test", ip_address="10.0.0.1", ssh_port=22, os_type="linux"
         )
-        db_session.add(server)
-        await db_session.flush()
-
         agent = AgentStatus(
-            server_id=server.id,
+            server=server,
             deployment_status="active",
             agent_token_hash="abc123",
-            last_heartbeat_at=datetime.now(timezone.utc),
+            last_heartbeat_at=_NOW,
         )
-        db_session.add(agent)
+        db_session.add_all([server, agent])
         await db_session.commit()
 
-        pool = MagicMock()
-        manager = AgentManager(pool)
-        healthy = await manager.check_health(db_session, server.id)
+        manager = AgentManager(_POOL_STUB)
+        healthy = await manager.check_health(db_session, server.id, now=_NOW)
         assert healthy is True
 
     @pytest.mark.asyncio
@@ -81,26 +88,21 @@ class TestAgentManagerHealthCheck:
         server = Server(
             hostname="stale-test", ip_address="10.0.0.2", ssh_port=22, os_type="linux"
         )
-        db_session.add(server)
-        await db_session.flush()
-
         agent = AgentStatus(
-            server_id=server.id,
+            server=server,
             deployment_status="active",
             agent_token_hash="abc456",
-            last_heartbeat_at=datetime.now(timezone.utc) - timedelta(minutes=10),
+            last_heartbeat_at=_NOW - timedelta(minutes=10),
         )
-        db_session.add(agent)
+        db_session.add_all([server, agent])
         await db_session.commit()
 
-        pool = MagicMock()
-        manager = AgentManager(pool)
-        healthy = await manager.check_health(db_session, server.id)
+        manager = AgentManager(_POOL_STUB)
+        healthy = await manager.check_health(db_session, server.id, now=_NOW)
         assert healthy is False
 
     @pytest.mark.asyncio
     async def test_no_agent(self, db_session):
-        pool = MagicMock()
-        manager = AgentManager(pool)
+        manager = AgentManager(_POOL_STUB)
         healthy = await manager.check_health(db_session, 99999)
         assert healthy is False
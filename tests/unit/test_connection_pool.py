@@ -13,15 +13,13 @@ from keyspider.core.ssh_connector import (
 
 class TestSSHConnectionWrapper:
     def test_wrapper_has_unique_id(self):
-        from unittest.mock import MagicMock
-        conn = MagicMock()
+        conn = object()
         w1 = SSHConnectionWrapper(conn=conn, hostname="10.0.0.1", port=22)
         w2 = SSHConnectionWrapper(conn=conn, hostname="10.0.0.1", port=22)
         assert w1.wrapper_id != w2.wrapper_id
 
     def test_wrapper_defaults(self):
-        from unittest.mock import MagicMock
-        conn = MagicMock()
+        conn = object()
         w = SSHConnectionWrapper(conn=conn, hostname="10.0.0.1", port=22)
         assert w.in_use is False
         assert w.hostname == "10.0.0.1"
@@ -0,0 +1,81 @@
+"""Tests for auth dependency helpers."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from keyspider import dependencies
+from keyspider.dependencies import _cache_token, _get_cached_token, _token_digest
+
+
+class TestTokenCache:
+    def setup_method(self):
+        dependencies._token_cache.clear()
+
+    def test_cached_token_returns_user_id(self):
+        digest = _token_digest("token-a")
+        _cache_token(digest, 42, time.time() + 3600)
+        assert _get_cached_token(digest) == 42
+
+    def test_unknown_token_misses(self):
+        assert _get_cached_token(_token_digest("never-seen")) is None
+
+    def test_expired_token_not_cached(self):
+        digest = _token_digest("token-b")
+        _cache_token(digest, 7, time.time() - 1)
+        assert _get_cached_token(digest) is None
+
+    def test_entry_bounded_by_exp(self):
+        digest = _token_digest("token-c")
+        _cache_token(digest, 7, time.time() + 5)
+        _, deadline = dependencies._token_cache[digest]
+        assert deadline <= time.monotonic() + 5
+
+    def test_evicts_oldest_when_full(self, monkeypatch):
+        monkeypatch.setattr(dependencies, "_TOKEN_CACHE_MAX_SIZE", 2)
+        digests = [_token_digest(f"t{i}") for i in range(3)]
+        for i, digest in enumerate(digests):
+            _cache_token(digest, i, None)
+        assert _get_cached_token(digests[0]) is None
+        assert _get_cached_token(digests[2]) == 2
+
+
+class TestHashAPIKey:
+    def test_long_pepper(self, monkeypatch):
+        from keyspider.config import settings
+        from keyspider.models.api_key import hash_api_key
+
+        monkeypatch.setattr(settings, "api_key_pepper", "ab" * 64)
+        digest = hash_api_key("ks_raw_key")
+        assert len(digest) == 64
+        assert digest == hash_api_key("ks_raw_key")
+
+        monkeypatch.setattr(settings, "api_key_pepper", "cd" * 64)
+        assert hash_api_key("ks_raw_key") != digest
+
+
+_USED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_USED_LATER = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+class _FailingSession:
+    async def execute(self, *args, **kwargs):
+        # A request records a newer use while the UPDATE is in flight
+        dependencies._pending_last_used[2] = _USED_LATER
+        raise ConnectionError("connection dropped")
+
+    async def commit(self):
+        raise AssertionError("commit after failed execute")
+
+
+class TestFlushAPIKeyUsage:
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_pending(self, monkeypatch):
+        monkeypatch.setattr(dependencies, "_pending_last_used", {1: _USED, 2: _USED})
+
+        with pytest.raises(ConnectionError):
+            await dependencies.flush_api_key_usage(_FailingSession())
+
+        assert dependencies._pending_last_used == {1: _USED, 2: _USED_LATER}
+
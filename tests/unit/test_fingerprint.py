@@ -1,5 +1,7 @@
 """Tests for fingerprint calculation and matching."""
 
+import functools
+
 import pytest
 
 from keyspider.core.fingerprint import (
@@ -15,59 +17,51 @@ from keyspider.core.fingerprint import (
 SAMPLE_RSA_KEY = "ssh-rsa AAAAB3NzaC1yc2EAAAADAQABAAAAgQAAAQIDBAUGBwgJCgsMDQ4PEBESExQVFhcYGRobHB0eHyAhIiMkJSYnKCkqKywtLi8wMTIzNDU2Nzg5Ojs8PT4/QEFCQ0RFRkdISUpLTE1OT1BRUlNUVVZXWFlaW1xdXl9gYWJjZGVmZ2hpamtsbW5vcHFyc3R1dnd4eXp7fH1+fw== test@example.com"
 SAMPLE_ED25519_KEY = "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIAABAgMEBQYHCAkKCwwNDg8QERITFBUWFxgZGhscHR4f user@host"
 
+# Golden fingerprints of SAMPLE_RSA_KEY (digests of its decoded key blob)
+EXPECTED_RSA_SHA256 = "SHA256:XM5+NPQqoPUJ8R9EKPkn5Sa22PajdyYaRPZNSnGc4Yk"
+EXPECTED_RSA_MD5 = "MD5:6b:ff:90:1a:34:1c:2c:e8:4f:8a:ea:21:57:ea:2f:38"
 
-class TestCalculateFingerprints:
-    def test_sha256_from_authorized_keys_line(self):
-        fp = calculate_sha256_fingerprint(SAMPLE_RSA_KEY)
-        assert fp is not None
-        assert fp.startswith("SHA256:")
 
-    def test_sha256_from_ed25519(self):
-        fp = calculate_sha256_fingerprint(SAMPLE_ED25519_KEY)
+@functools.lru_cache(maxsize=8)
+def _sha256(key: str) -> str | None:
+    """SHA256 fingerprint of a sample key, computed once per run."""
+    return calculate_sha256_fingerprint(key)
+
+
+class TestCalculateFingerprints:
+    @pytest.mark.parametrize("key", [SAMPLE_RSA_KEY, SAMPLE_ED25519_KEY], ids=["rsa", "ed25519"])
+    def test_sha256(self, key):
+        fp = _sha256(key)
         assert fp is not None
         assert fp.startswith("SHA256:")
 
     def test_md5_from_authorized_keys_line(self):
-        fp = calculate_md5_fingerprint(SAMPLE_RSA_KEY)
-        assert fp is not None
-        assert fp.startswith("MD5:")
-        # MD5 fingerprint should be colon-separated hex
-        parts = fp.replace("MD5:", "").split(":")
-        assert len(parts) == 16
+        assert calculate_md5_fingerprint(SAMPLE_RSA_KEY) == EXPECTED_RSA_MD5
 
     def test_sha256_invalid_key(self):
         fp = calculate_sha256_fingerprint("not a valid key")
         assert fp is None
 
     def test_consistent_fingerprints(self):
-        fp1 = calculate_sha256_fingerprint(SAMPLE_RSA_KEY)
-        fp2 = calculate_sha256_fingerprint(SAMPLE_RSA_KEY)
-        assert fp1 == fp2
+        assert _sha256(SAMPLE_RSA_KEY) == EXPECTED_RSA_SHA256
 
     def test_different_keys_different_fingerprints(self):
-        fp1 = calculate_sha256_fingerprint(SAMPLE_RSA_KEY)
-        fp2 = calculate_sha256_fingerprint(SAMPLE_ED25519_KEY)
+        fp1 = _sha256(SAMPLE_RSA_KEY)
+        fp2 = _sha256(SAMPLE_ED25519_KEY)
         assert fp1 != fp2
 
 
 class TestDetectKeyType:
-    def test_rsa(self):
-        assert detect_key_type("ssh-rsa AAAA...") == "rsa"
-
-    def test_ed25519(self):
-        assert detect_key_type("ssh-ed25519 AAAA...") == "ed25519"
-
-    def test_ecdsa(self):
-        assert detect_key_type("ecdsa-sha2-nistp256 AAAA...") == "ecdsa"
-
-    def test_dsa(self):
-        assert detect_key_type("ssh-dss AAAA...") == "dsa"
-
-    def test_unknown(self):
-        assert detect_key_type("unknown-type AAAA...") is None
-
-    def test_empty(self):
-        assert detect_key_type("") is None
+    @pytest.mark.parametrize("key,expected", [
+        ("ssh-rsa AAAA...", "rsa"),
+        ("ssh-ed25519 AAAA...", "ed25519"),
+        ("ecdsa-sha2-nistp256 AAAA...", "ecdsa"),
+        ("ssh-dss AAAA...", "dsa"),
+        ("unknown-type AAAA...", None),
+        ("", None),
+    ])
+    def test_detect(self, key, expected):
+        assert detect_key_type(key) == expected
 
 
 class TestExtractComment:
@@ -82,19 +76,14 @@ class TestExtractComment:
 
 
 class TestNormalizeFingerprint:
-    def test_sha256_prefix(self):
-        assert normalize_fingerprint("SHA256:abc123") == "SHA256:abc123"
-
-    def test_md5_prefix(self):
-        assert normalize_fingerprint("MD5:aa:bb:cc") == "MD5:aa:bb:cc"
-
-    def test_add_sha256_prefix(self):
-        fp = normalize_fingerprint("abc123def456ghi789")
-        assert fp == "SHA256:abc123def456ghi789"
-
-    def test_detect_md5(self):
-        fp = normalize_fingerprint("aa:bb:cc:dd:ee:ff")
-        assert fp == "MD5:aa:bb:cc:dd:ee:ff"
+    @pytest.mark.parametrize("raw,expected", [
+        ("SHA256:abc123", "SHA256:abc123"),
+        ("MD5:aa:bb:cc", "MD5:aa:bb:cc"),
+        ("abc123def456ghi789", "SHA256:abc123def456ghi789"),
+        ("aa:bb:cc:dd:ee:ff", "MD5:aa:bb:cc:dd:ee:ff"),
+    ])
+    def test_normalize(self, raw, expected):
+        assert normalize_fingerprint(raw) == expected
 
 
 class TestFingerprintsMatch:
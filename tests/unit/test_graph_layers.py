@@ -3,144 +3,156 @@
 import pytest
 from datetime import datetime, timezone
 
+from sqlalchemy import event, insert
+from sqlalchemy.exc import InvalidRequestError
+
 from keyspider.core.graph_builder import GraphBuilder
 from keyspider.models.server import Server
 from keyspider.models.access_path import AccessPath
 from keyspider.models.ssh_key import SSHKey
 from keyspider.models.key_location import KeyLocation
 
-_NOW = datetime.now(timezone.utc)
+_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+async def _bulk_insert_paths(db_session, rows):
+    """Insert AccessPath rows in one executemany, bypassing the unit of work."""
+    await db_session.execute(insert(AccessPath), [
+        {"is_active": True, "first_seen_at": _NOW, "last_seen_at": _NOW, **row}
+        for row in rows
+    ])
+
+
+async def _seed_pair(db_session, hostnames, subnet, *paths):
+    """Store two servers and the access paths between them.
+
+    ``paths`` are (forward, AccessPath column values) pairs; forward paths run
+    from the first server to the second. The servers, and any ``ssh_key``
+    given in a path, are flushed once so the paths can be bulk inserted by id.
+    """
+    s1 = Server(hostname=hostnames[0], ip_address=f"{subnet}.1", ssh_port=22, os_type="linux")
+    s2 = Server(hostname=hostnames[1], ip_address=f"{subnet}.2", ssh_port=22, os_type="linux")
+    db_session.add_all([s1, s2])
+    db_session.add_all(kwargs["ssh_key"] for _, kwargs in paths if "ssh_key" in kwargs)
+    await db_session.flush()
+
+    rows = []
+    for forward, kwargs in paths:
+        source, target = (s1, s2) if forward else (s2, s1)
+        row = {k: v for k, v in kwargs.items() if k != "ssh_key"}
+        if "ssh_key" in kwargs:
+            row["ssh_key_id"] = kwargs["ssh_key"].id
+        rows.append({"source_server_id": source.id, "target_server_id": target.id, **row})
+    await _bulk_insert_paths(db_session, rows)
+    return s1, s2
+
+
+@pytest.fixture
+def graph_builder(db_session):
+    return GraphBuilder(db_session)
 
 
 class TestGraphLayers:
     @pytest.mark.asyncio
-    async def test_build_full_graph_no_filter(self, db_session):
-        s1 = Server(hostname="src", ip_address="10.0.0.1", ssh_port=22, os_type="linux")
-        s2 = Server(hostname="dst", ip_address="10.0.0.2", ssh_port=22, os_type="linux")
-        db_session.add_all([s1, s2])
-        await db_session.flush()
-
-        path = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="root", event_count=5, is_active=True,
-            is_authorized=True, is_used=True, first_seen_at=_NOW, last_seen_at=_NOW,
-        )
-        db_session.add(path)
-        await db_session.commit()
+    async def test_build_full_graph_no_filter(self, db_session, graph_builder):
+        await _seed_pair(db_session, ("src", "dst"), "10.0.0", (True, dict(
+            username="root", event_count=5, is_authorized=True, is_used=True,
+        )))
 
-        builder = GraphBuilder(db_session)
-        graph = await builder.build_full_graph()
+        graph = await graph_builder.build_full_graph()
         assert graph.node_count >= 2
         assert graph.edge_count >= 1
 
     @pytest.mark.asyncio
-    async def test_build_full_graph_authorization_filter(self, db_session):
-        s1 = Server(hostname="src-auth", ip_address="10.0.1.1", ssh_port=22, os_type="linux")
-        s2 = Server(hostname="dst-auth", ip_address="10.0.1.2", ssh_port=22, os_type="linux")
-        db_session.add_all([s1, s2])
-        await db_session.flush()
-
-        path_auth = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="deploy", event_count=0, is_active=True,
-            is_authorized=True, is_used=False, first_seen_at=_NOW, last_seen_at=_NOW,
+    async def test_build_full_graph_key_types(self, db_session, graph_builder):
+        key = SSHKey(fingerprint_sha256="SHA256:graph_kt_fp", key_type="ed25519")
+        await _seed_pair(
+            db_session, ("src-kt", "dst-kt"), "10.0.7",
+            (True, dict(
+                ssh_key=key, username="keyed", event_count=1,
+                is_authorized=True, is_used=True,
+            )),
+            (False, dict(
+                username="keyless", event_count=1, is_authorized=False, is_used=True,
+            )),
         )
-        db_session.add(path_auth)
-        await db_session.commit()
 
-        builder = GraphBuilder(db_session)
-        graph = await builder.build_full_graph(layer="authorization")
+        graph = await graph_builder.build_full_graph()
+        key_types = {e.username: e.key_type for e in graph.edges}
+        assert key_types == {"keyed": "ed25519", "keyless": None}
+
+    @pytest.mark.asyncio
+    async def test_build_full_graph_forbids_lazy_loads(self, db_session, graph_builder):
+        await _seed_pair(db_session, ("src-rl", "dst-rl"), "10.0.8", (True, dict(
+            username="lazy", event_count=1, is_authorized=True, is_used=True,
+        )))
+
+        loaded = []
+
+        def _on_load(target, context):
+            loaded.append(target)
+
+        event.listen(AccessPath, "load", _on_load)
+        try:
+            await graph_builder.build_full_graph()
+        finally:
+            event.remove(AccessPath, "load", _on_load)
+        [path] = loaded
+        with pytest.raises(InvalidRequestError):
+            path.source_server
+
+    @pytest.mark.asyncio
+    async def test_build_full_graph_authorization_filter(self, db_session, graph_builder):
+        await _seed_pair(db_session, ("src-auth", "dst-auth"), "10.0.1", (True, dict(
+            username="deploy", event_count=0, is_authorized=True, is_used=False,
+        )))
+
+        graph = await graph_builder.build_full_graph(layer="authorization")
         auth_edges = [e for e in graph.edges if e.is_authorized]
         assert len(auth_edges) >= 1
 
     @pytest.mark.asyncio
-    async def test_build_full_graph_usage_filter(self, db_session):
-        s1 = Server(hostname="src-use", ip_address="10.0.2.1", ssh_port=22, os_type="linux")
-        s2 = Server(hostname="dst-use", ip_address="10.0.2.2", ssh_port=22, os_type="linux")
-        db_session.add_all([s1, s2])
-        await db_session.flush()
-
-        path_use = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="mystery_user", event_count=10, is_active=True,
-            is_authorized=False, is_used=True, first_seen_at=_NOW, last_seen_at=_NOW,
-        )
-        db_session.add(path_use)
-        await db_session.commit()
+    async def test_build_full_graph_usage_filter(self, db_session, graph_builder):
+        await _seed_pair(db_session, ("src-use", "dst-use"), "10.0.2", (True, dict(
+            username="mystery_user", event_count=10, is_authorized=False, is_used=True,
+        )))
 
-        builder = GraphBuilder(db_session)
-        graph = await builder.build_full_graph(layer="usage")
+        graph = await graph_builder.build_full_graph(layer="usage")
         used_edges = [e for e in graph.edges if e.is_used]
         assert len(used_edges) >= 1
 
 
 class TestLayeredGraph:
     @pytest.mark.asyncio
-    async def test_build_layered_graph_all(self, db_session):
-        s1 = Server(hostname="lg-src", ip_address="10.0.3.1", ssh_port=22, os_type="linux")
-        s2 = Server(hostname="lg-dst", ip_address="10.0.3.2", ssh_port=22, os_type="linux")
-        db_session.add_all([s1, s2])
-        await db_session.flush()
-
-        dormant = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="dormant", event_count=0, is_active=True,
-            is_authorized=True, is_used=False, first_seen_at=_NOW, last_seen_at=_NOW,
-        )
-        mystery = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="mystery", event_count=5, is_active=True,
-            is_authorized=False, is_used=True, first_seen_at=_NOW, last_seen_at=_NOW,
+    async def test_build_layered_graph_all(self, db_session, graph_builder):
+        await _seed_pair(
+            db_session, ("lg-src", "lg-dst"), "10.0.3",
+            (True, dict(username="dormant", event_count=0, is_authorized=True, is_used=False)),
+            (True, dict(username="mystery", event_count=5, is_authorized=False, is_used=True)),
         )
-        db_session.add_all([dormant, mystery])
-        await db_session.commit()
 
-        builder = GraphBuilder(db_session)
-        graph = await builder.build_layered_graph("all", show_dormant=True, show_mystery=True)
+        graph = await graph_builder.build_layered_graph("all", show_dormant=True, show_mystery=True)
         assert graph.edge_count >= 2
 
     @pytest.mark.asyncio
-    async def test_build_layered_graph_hide_dormant(self, db_session):
-        s1 = Server(hostname="hd-src", ip_address="10.0.4.1", ssh_port=22, os_type="linux")
-        s2 = Server(hostname="hd-dst", ip_address="10.0.4.2", ssh_port=22, os_type="linux")
-        db_session.add_all([s1, s2])
-        await db_session.flush()
-
-        dormant = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="dormant2", event_count=0, is_active=True,
-            is_authorized=True, is_used=False, first_seen_at=_NOW, last_seen_at=_NOW,
-        )
-        normal = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="normal", event_count=3, is_active=True,
-            is_authorized=True, is_used=True, first_seen_at=_NOW, last_seen_at=_NOW,
+    async def test_build_layered_graph_hide_dormant(self, db_session, graph_builder):
+        await _seed_pair(
+            db_session, ("hd-src", "hd-dst"), "10.0.4",
+            (True, dict(username="dormant2", event_count=0, is_authorized=True, is_used=False)),
+            (True, dict(username="normal", event_count=3, is_authorized=True, is_used=True)),
         )
-        db_session.add_all([dormant, normal])
-        await db_session.commit()
 
-        builder = GraphBuilder(db_session)
-        graph = await builder.build_layered_graph("all", show_dormant=False, show_mystery=True)
+        graph = await graph_builder.build_layered_graph("all", show_dormant=False, show_mystery=True)
         dormant_edges = [e for e in graph.edges if e.is_authorized and not e.is_used]
         assert len(dormant_edges) == 0
 
     @pytest.mark.asyncio
-    async def test_build_layered_graph_hide_mystery(self, db_session):
-        s1 = Server(hostname="hm-src", ip_address="10.0.5.1", ssh_port=22, os_type="linux")
-        s2 = Server(hostname="hm-dst", ip_address="10.0.5.2", ssh_port=22, os_type="linux")
-        db_session.add_all([s1, s2])
-        await db_session.flush()
-
-        mystery = AccessPath(
-            source_server_id=s1.id, target_server_id=s2.id,
-            username="mystery3", event_count=7, is_active=True,
-            is_authorized=False, is_used=True, first_seen_at=_NOW, last_seen_at=_NOW,
-        )
-        db_session.add_all([mystery])
-        await db_session.commit()
+    async def test_build_layered_graph_hide_mystery(self, db_session, graph_builder):
+        await _seed_pair(db_session, ("hm-src", "hm-dst"), "10.0.5", (True, dict(
+            username="mystery3", event_count=7, is_authorized=False, is_used=True,
+        )))
 
-        builder = GraphBuilder(db_session)
-        graph = await builder.build_layered_graph("all", show_dormant=True, show_mystery=False)
+        graph = await graph_builder.build_layered_graph("all", show_dormant=True, show_mystery=False)
         mystery_edges = [e for e in graph.edges if e.is_used and not e.is_authorized]
         assert len(mystery_edges) == 0
 
@@ -148,41 +160,27 @@ class TestLayeredGraph:
 class TestKeyLocationGraphLayer:
     @pytest.mark.asyncio
     async def test_key_location_default_layer(self, db_session):
-        server = Server(hostname="kl-test", ip_address="10.0.6.1", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
-        key = SSHKey(fingerprint_sha256="SHA256:layer_test_fp", key_type="rsa")
-        db_session.add(key)
-        await db_session.flush()
-
         loc = KeyLocation(
-            ssh_key_id=key.id, server_id=server.id,
+            ssh_key=SSHKey(fingerprint_sha256="SHA256:layer_test_fp", key_type="rsa"),
+            server=Server(hostname="kl-test", ip_address="10.0.6.1", ssh_port=22, os_type="linux"),
             file_path="/root/.ssh/authorized_keys",
             file_type="authorized_keys",
         )
         db_session.add(loc)
-        await db_session.commit()
+        await db_session.flush()
 
         assert loc.graph_layer == "authorization"
 
     @pytest.mark.asyncio
     async def test_key_location_usage_layer(self, db_session):
-        server = Server(hostname="kl-test2", ip_address="10.0.6.2", ssh_port=22, os_type="linux")
-        db_session.add(server)
-        await db_session.flush()
-
-        key = SSHKey(fingerprint_sha256="SHA256:layer_test_fp2", key_type="ed25519")
-        db_session.add(key)
-        await db_session.flush()
-
         loc = KeyLocation(
-            ssh_key_id=key.id, server_id=server.id,
+            ssh_key=SSHKey(fingerprint_sha256="SHA256:layer_test_fp2", key_type="ed25519"),
+            server=Server(hostname="kl-test2", ip_address="10.0.6.2", ssh_port=22, os_type="linux"),
             file_path="/root/.ssh/authorized_keys",
             file_type="authorized_keys",
             graph_layer="usage",
         )
         db_session.add(loc)
-        await db_session.commit()
+        await db_session.flush()
 
         assert loc.graph_layer == "usage"
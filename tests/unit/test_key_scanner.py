@@ -2,7 +2,9 @@
 
 import pytest
 
+from keyspider.core import key_scanner
 from keyspider.core.key_scanner import _strip_authorized_keys_options, DiscoveredKey
+from keyspider.core.sftp_reader import FileInfo
 
 
 class TestStripAuthorizedKeysOptions:
@@ -31,6 +33,11 @@ class TestStripAuthorizedKeysOptions:
         result = _strip_authorized_keys_options(line)
         assert result == "ecdsa-sha2-nistp256 AAAA... user@host"
 
+    def test_key_type_inside_quoted_option(self):
+        line = 'command="echo ssh-rsa AAAA",no-pty ssh-ed25519 AAAA... admin'
+        result = _strip_authorized_keys_options(line)
+        assert result == "ssh-ed25519 AAAA... admin"
+
 
 class TestDiscoveredKeyDataclass:
     def test_default_values(self):
@@ -69,3 +76,48 @@ class TestDiscoveredKeyDataclass:
         )
         assert key.file_mtime == mtime
         assert key.file_size == 512
+
+    def test_frozen_and_hashable(self):
+        import dataclasses
+        key = DiscoveredKey(
+            fingerprint_sha256="SHA256:dup",
+            fingerprint_md5=None,
+            key_type="ed25519",
+            public_key_data="ssh-ed25519 AAAA",
+            comment=None,
+            file_path="/root/.ssh/authorized_keys",
+            file_type="authorized_keys",
+            unix_owner="root",
+            unix_permissions="0600",
+        )
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            key.file_size = 1
+        assert len({key, dataclasses.replace(key)}) == 1
+
+
+class TestScanUserSSHDir:
+    @pytest.mark.asyncio
+    async def test_unlistable_dir_probes_each_path(self, monkeypatch):
+        pub = "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIAABAgMEBQYHCAkKCwwNDg8QERITFBUWFxgZGhscHR4f u@h"
+        files = {"/home/bob/.ssh/authorized_keys": pub}
+        reader = key_scanner.SFTPReader
+
+        async def list_dir_with_stat(conn, path):
+            return None  # e.g. an exec-only 0711 .ssh
+
+        async def read_file(conn, path):
+            return files.get(path)
+
+        async def stat_file(conn, path):
+            if path in files:
+                return FileInfo(mtime=None, size=len(files[path]), permissions="0600")
+            return None
+
+        monkeypatch.setattr(reader, "list_dir_with_stat", list_dir_with_stat)
+        monkeypatch.setattr(reader, "read_file", read_file)
+        monkeypatch.setattr(reader, "stat_file", stat_file)
+
+        keys = await key_scanner._scan_user_ssh_dir(object(), "bob", "/home/bob")
+        assert [(k.file_path, k.unix_permissions) for k in keys] == [
+            ("/home/bob/.ssh/authorized_keys", "0600"),
+        ]
@@ -0,0 +1,86 @@
+"""Tests for common query helpers."""
+
+import pytest
+from sqlalchemy import func, select
+
+from keyspider.db.queries import bulk_insert, find_server_by_host, paginate
+from keyspider.models.server import Server
+
+
+class TestPaginate:
+    @pytest.mark.asyncio
+    async def test_returns_page_and_total(self, db_session):
+        db_session.add_all(
+            Server(hostname=f"host-{i:02d}", ip_address=f"10.0.0.{i}", is_reachable=i % 2 == 0)
+            for i in range(10)
+        )
+        await db_session.flush()
+
+        stmt = select(Server).where(Server.is_reachable.is_(True)).order_by(Server.hostname)
+        items, total = await paginate(db_session, stmt, offset=1, limit=2)
+
+        assert total == 5
+        assert [s.hostname for s in items] == ["host-02", "host-04"]
+
+    @pytest.mark.asyncio
+    async def test_custom_count_statement(self, db_session):
+        db_session.add_all(
+            Server(hostname=f"host-{i:02d}", ip_address=f"10.0.0.{i}") for i in range(3)
+        )
+        await db_session.flush()
+
+        stmt = select(Server).order_by(Server.hostname)
+        count_stmt = select(func.count()).select_from(Server)
+        items, total = await paginate(db_session, stmt, limit=1, count_stmt=count_stmt)
+
+        assert total == 3
+        assert [s.hostname for s in items] == ["host-00"]
+
+    @pytest.mark.asyncio
+    async def test_grouped_select_counts_groups(self, db_session):
+        db_session.add_all(
+            Server(hostname=f"host-{i:02d}", ip_address=f"10.0.0.{i}", os_type=os_type)
+            for i, os_type in enumerate(["linux", "linux", "aix"])
+        )
+        await db_session.flush()
+
+        stmt = select(Server.os_type).group_by(Server.os_type).order_by(Server.os_type)
+        items, total = await paginate(db_session, stmt)
+
+        assert total == 2
+        assert list(items) == ["aix", "linux"]
+
+
+class TestBulkInsert:
+    @pytest.mark.asyncio
+    async def test_inserts_rows(self, db_session):
+        await bulk_insert(db_session, Server, [])
+        await bulk_insert(db_session, Server, [
+            {"hostname": f"bulk-{i}", "ip_address": f"10.1.0.{i}"} for i in range(3)
+        ])
+
+        result = await db_session.execute(select(Server.hostname).order_by(Server.hostname))
+        assert result.scalars().all() == ["bulk-0", "bulk-1", "bulk-2"]
+
+
+class TestFindServerByHost:
+    @pytest.mark.asyncio
+    async def test_prefers_exact_hostname_over_case_variant(self, db_session):
+        db_session.add_all([
+            Server(hostname="Web01", ip_address="10.2.0.1"),
+            Server(hostname="web01", ip_address="10.2.0.2"),
+        ])
+        await db_session.flush()
+
+        assert (await find_server_by_host(db_session, "web01")).ip_address == "10.2.0.2"
+        assert (await find_server_by_host(db_session, "Web01")).ip_address == "10.2.0.1"
+        assert (await find_server_by_host(db_session, "WEB01")).hostname == "Web01"
+
+    @pytest.mark.asyncio
+    async def test_matches_ip_address(self, db_session):
+        db_session.add(Server(hostname="db01", ip_address="10.2.0.3"))
+        await db_session.flush()
+
+        assert (await find_server_by_host(db_session, "10.2.0.3")).hostname == "db01"
+        assert await find_server_by_host(db_session, "missing") is None
+
@@ -0,0 +1,31 @@
+"""Tests for list response helpers."""
+
+import json
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from keyspider.api.responses import list_response
+from keyspider.models.server import Server
+from keyspider.schemas.server import ServerListResponse, ServerResponse
+
+
+class TestListResponse:
+    @pytest.mark.asyncio
+    async def test_matches_wrapper_model(self, db_session):
+        db_session.add_all(
+            Server(hostname=f"host-{i}", ip_address=f"10.0.0.{i}") for i in range(3)
+        )
+        await db_session.flush()
+        items = (await db_session.execute(select(Server).order_by(Server.id))).scalars().all()
+
+        response = list_response(TypeAdapter(list[ServerResponse]), items, 7, 0, 3)
+
+        expected = ServerListResponse(items=items, total=7, offset=0, limit=3)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == json.loads(expected.model_dump_json())
+
+    def test_envelope_without_paging(self):
+        response = list_response(TypeAdapter(list[ServerResponse]), [], 0)
+        assert json.loads(response.body) == {"items": [], "total": 0}
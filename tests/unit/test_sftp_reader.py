@@ -1,8 +1,12 @@
 """Tests for the SFTP reader module (mocked asyncssh)."""
 
+import asyncio
+
+import asyncssh
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 from keyspider.core.sftp_reader import SFTPReader, FileInfo
 
@@ -15,6 +19,11 @@ class MockSFTPAttrs:
         self.permissions = permissions
 
 
+# Shared read-only attrs for tests that only need a file or directory to exist
+_FILE_ATTRS = MockSFTPAttrs()
+_DIR_ATTRS = MockSFTPAttrs(permissions=0o40755)
+
+
 class MockSFTPFile:
     """Mock for an SFTP file handle."""
     def __init__(self, content: bytes | str = b"file content"):
@@ -47,25 +56,31 @@ class MockSFTPClient:
 
     async def stat(self, path):
         if self._raise_on_stat:
-            import asyncssh
             raise asyncssh.SFTPNoSuchFile("Not found")
-        if path not in self._files:
-            import asyncssh
+        if "attrs" not in self._files.get(path, {}):
             raise asyncssh.SFTPNoSuchFile(f"No such file: {path}")
         return self._files[path]["attrs"]
 
-    def open(self, path, mode="r"):
+    def open(self, path, mode="r", **kwargs):
         if path not in self._files:
-            import asyncssh
             raise asyncssh.SFTPNoSuchFile(f"No such file: {path}")
         return MockSFTPFile(self._files[path].get("content", b""))
 
     async def listdir(self, path):
         if path not in self._files:
-            import asyncssh
             raise asyncssh.SFTPNoSuchFile(f"No such dir: {path}")
         return self._files[path].get("entries", [])
 
+    async def readdir(self, path):
+        """Entries with lstat attrs: a child's "lattrs" if given, else its "attrs"."""
+        names = [".", ".."] + await self.listdir(path)
+        entries = []
+        for name in names:
+            child = self._files.get(f"{path}/{name}", {})
+            attrs = child.get("lattrs", child.get("attrs", _DIR_ATTRS))
+            entries.append(SimpleNamespace(filename=name, attrs=attrs))
+        return entries
+
     async def __aenter__(self):
         return self
 
@@ -73,11 +88,22 @@ class MockSFTPClient:
         pass
 
 
+class MockConnection:
+    """Mock for asyncssh SSHClientConnection that hands out one SFTP client."""
+    __slots__ = ("_sftp", "sftp_starts", "__weakref__")
+
+    def __init__(self, sftp_client):
+        self._sftp = sftp_client
+        self.sftp_starts = 0
+
+    async def start_sftp_client(self):
+        self.sftp_starts += 1
+        return self._sftp
+
+
 def _make_conn(sftp_client):
     """Create a mock SSH connection that returns the given SFTP client."""
-    conn = MagicMock()
-    conn.start_sftp_client = MagicMock(return_value=sftp_client)
-    return conn
+    return MockConnection(sftp_client)
 
 
 class TestSFTPReaderStatFile:
@@ -104,11 +130,43 @@ class TestSFTPReaderStatFile:
         assert info is None
 
 
+class TestSFTPReaderTail:
+    @staticmethod
+    def _conn(content: bytes):
+        return _make_conn(MockSFTPClient(files={
+            "/var/log/auth.log": {"attrs": MockSFTPAttrs(size=len(content)), "content": content},
+        }))
+
+    @pytest.mark.asyncio
+    async def test_whole_file(self):
+        conn = self._conn(b"one\ntwo\nthree\n")
+        assert await SFTPReader.read_file_tail(conn, "/var/log/auth.log") == "one\ntwo\nthree"
+
+    @pytest.mark.asyncio
+    async def test_last_lines_across_chunks(self):
+        content = b"".join(b"line %d\n" % i for i in range(100))
+        conn = self._conn(content)
+        with patch("keyspider.core.sftp_reader._TAIL_CHUNK_SIZE", 16):
+            lines = await SFTPReader.read_tail_lines(conn, "/var/log/auth.log", max_lines=3)
+        assert list(lines) == ["line 97", "line 98", "line 99"]
+
+    @pytest.mark.asyncio
+    async def test_max_bytes_drops_partial_line(self):
+        conn = self._conn(b"first line\nsecond\nthird")
+        text = await SFTPReader.read_file_tail(conn, "/var/log/auth.log", max_bytes=15)
+        assert text == "second\nthird"
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self):
+        conn = _make_conn(MockSFTPClient(files={}))
+        assert await SFTPReader.read_tail_lines(conn, "/no/such/file") is None
+
+
 class TestSFTPReaderFileExists:
     @pytest.mark.asyncio
     async def test_file_exists(self):
         sftp = MockSFTPClient(files={
-            "/etc/passwd": {"attrs": MockSFTPAttrs()},
+            "/etc/passwd": {"attrs": _FILE_ATTRS},
         })
         conn = _make_conn(sftp)
         assert await SFTPReader.file_exists(conn, "/etc/passwd") is True
@@ -125,7 +183,7 @@ class TestSFTPReaderListDir:
     async def test_list_dir(self):
         sftp = MockSFTPClient(files={
             "/home/user/.ssh": {
-                "attrs": MockSFTPAttrs(),
+                "attrs": _FILE_ATTRS,
                 "entries": ["authorized_keys", "id_rsa", "id_rsa.pub"],
             }
         })
@@ -143,6 +201,78 @@ class TestSFTPReaderListDir:
         assert entries is None
 
 
+class TestSFTPReaderListDirWithStat:
+    @pytest.mark.asyncio
+    async def test_entries_with_metadata(self):
+        link = MockSFTPAttrs(size=20, permissions=0o120777)
+        sftp = MockSFTPClient(files={
+            "/root/.ssh": {"entries": ["authorized_keys", "id_rsa", "linked", "dangling"]},
+            "/root/.ssh/authorized_keys": {"attrs": MockSFTPAttrs(size=400, permissions=0o100600)},
+            "/root/.ssh/id_rsa": {"attrs": MockSFTPAttrs(size=1700, permissions=0o100600)},
+            "/root/.ssh/linked": {"lattrs": link, "attrs": MockSFTPAttrs(size=90)},
+            "/root/.ssh/dangling": {"lattrs": link},
+        })
+        sftp.stat = AsyncMock(wraps=sftp.stat)
+        conn = _make_conn(sftp)
+
+        entries = await SFTPReader.list_dir_with_stat(conn, "/root/.ssh")
+
+        assert set(entries) == {"authorized_keys", "id_rsa", "linked"}
+        assert entries["authorized_keys"].size == 400
+        assert entries["authorized_keys"].permissions == "0600"
+        assert entries["linked"].size == 90
+        assert entries["linked"].permissions == "0644"
+        assert sftp.stat.await_count == 2  # only the two symlinks
+
+    @pytest.mark.asyncio
+    async def test_missing_dir(self):
+        conn = _make_conn(MockSFTPClient(files={}))
+        assert await SFTPReader.list_dir_with_stat(conn, "/no/such/dir") is None
+
+    @pytest.mark.asyncio
+    async def test_unstatable_link_drops_only_that_entry(self):
+        sftp = MockSFTPClient(files={
+            "/root/.ssh": {"entries": ["authorized_keys", "denied"]},
+            "/root/.ssh/authorized_keys": {"attrs": _FILE_ATTRS},
+            "/root/.ssh/denied": {"lattrs": MockSFTPAttrs(permissions=0o120777)},
+        })
+        stat = sftp.stat
+
+        async def _stat(path):
+            if path.endswith("/denied"):
+                raise asyncssh.SFTPPermissionDenied("denied")
+            return await stat(path)
+
+        sftp.stat = _stat
+        entries = await SFTPReader.list_dir_with_stat(_make_conn(sftp), "/root/.ssh")
+        assert set(entries) == {"authorized_keys"}
+
+
+class TestSFTPClientReuse:
+    @pytest.mark.asyncio
+    async def test_one_subsystem_per_connection(self):
+        sftp = MockSFTPClient(files={"/etc/passwd": {"attrs": _FILE_ATTRS}})
+        conn = _make_conn(sftp)
+        results = await asyncio.gather(
+            SFTPReader.stat_file(conn, "/etc/passwd"),
+            SFTPReader.file_exists(conn, "/etc/passwd"),
+            SFTPReader.file_exists(conn, "/etc/shadow"),
+        )
+        assert results[1:] == [True, False]
+        assert conn.sftp_starts == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_error_drops_client(self):
+        sftp = MockSFTPClient(files={"/etc/passwd": {"attrs": _FILE_ATTRS}})
+        conn = _make_conn(sftp)
+        assert await SFTPReader.file_exists(conn, "/etc/passwd") is True
+
+        sftp.stat = AsyncMock(side_effect=asyncssh.ConnectionLost("gone"))
+        assert await SFTPReader.file_exists(conn, "/etc/passwd") is False
+        assert await SFTPReader.file_exists(conn, "/etc/passwd") is False
+        assert conn.sftp_starts == 2
+
+
 class TestFileInfo:
     def test_dataclass_creation(self):
         info = FileInfo(
@@ -18,16 +18,16 @@ class TestSpiderProgress:
 
     def test_visited_tracking(self):
         progress = SpiderProgress()
-        progress.visited.add("10.0.0.1:22")
-        progress.visited.add("10.0.0.2:22")
+        progress.visited.add(("10.0.0.1", 22))
+        progress.visited.add(("10.0.0.2", 22))
         assert len(progress.visited) == 2
-        assert "10.0.0.1:22" in progress.visited
+        assert ("10.0.0.1", 22) in progress.visited
 
     def test_queue_management(self):
         progress = SpiderProgress()
         progress.queue.append(("10.0.0.1", 22, 0))
         progress.queue.append(("10.0.0.2", 22, 1))
         assert len(progress.queue) == 2
-        host, port, depth = progress.queue.pop(0)
+        host, port, depth = progress.queue.popleft()
         assert host == "10.0.0.1"
         assert depth == 0
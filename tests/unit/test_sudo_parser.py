@@ -75,3 +75,14 @@ class TestSudoParserEdgeCases:
         event = parse_sudo_line(line)
         assert event is not None
         assert event.raw_line == line
+
+    def test_pam_session_line(self):
+        line = "Jan  5 10:00:00 host sudo: pam_unix(sudo:session): session opened for user root by alice(uid=0)"
+        assert parse_sudo_line(line) is None
+
+    def test_command_containing_separator(self):
+        line = "Jan  5 10:00:00 host sudo[1]: user1 : TTY=pts/0 ; PWD=/ ; USER=root ; COMMAND=/bin/sh -c ls ; id"
+        event = parse_sudo_line(line)
+        assert event is not None
+        assert event.target_user == "root"
+        assert event.command == "/bin/sh -c ls ; id"
@@ -0,0 +1,82 @@
+"""Tests for unreachable source detection."""
+
+import pytest
+
+from keyspider.core.ssh_connector import SSHConnectionPool
+from keyspider.core.unreachable_detector import UnreachableDetector
+
+
+class TestIsPrivateIP:
+    def setup_method(self):
+        self.detector = UnreachableDetector(SSHConnectionPool())
+
+    def test_rfc1918_ranges(self):
+        assert self.detector.is_private_ip("10.1.2.3") is True
+        assert self.detector.is_private_ip("172.16.0.1") is True
+        assert self.detector.is_private_ip("172.31.255.255") is True
+        assert self.detector.is_private_ip("192.168.1.1") is True
+
+    def test_range_boundaries(self):
+        assert self.detector.is_private_ip("172.15.255.255") is False
+        assert self.detector.is_private_ip("172.32.0.0") is False
+        assert self.detector.is_private_ip("11.0.0.0") is False
+        assert self.detector.is_private_ip("192.169.0.1") is False
+
+    def test_public_ipv4(self):
+        assert self.detector.is_private_ip("8.8.8.8") is False
+        assert self.detector.is_private_ip("203.0.113.5") is False
+
+    def test_ipv6_ula(self):
+        assert self.detector.is_private_ip("fd00::1") is True
+        assert self.detector.is_private_ip("fc12:3456::1") is True
+
+    def test_public_ipv6(self):
+        assert self.detector.is_private_ip("2001:db8::1") is False
+        assert self.detector.is_private_ip("::1") is False
+
+    def test_invalid_input(self):
+        assert self.detector.is_private_ip("not-an-ip") is False
+        assert self.detector.is_private_ip("10.1") is False
+        assert self.detector.is_private_ip("") is False
+
+    def test_non_ascii_digits_rejected(self):
+        assert self.detector.is_private_ip("\u0661\u0660.0.0.1") is False
+        assert self.detector.is_private_ip("10.0.0.256") is False
+        assert self.detector.is_private_ip("010.0.0.1") is False
+
+
+class TestScanUnreachableSources:
+    @pytest.mark.asyncio
+    async def test_returns_only_unreachable(self):
+        detector = UnreachableDetector(SSHConnectionPool())
+        reachable = {"10.0.0.1"}
+
+        async def fake_check(ip, port=22):
+            if ip == "10.0.0.3":
+                raise OSError("probe failed")
+            return ip in reachable
+
+        async def fake_lookup(ip):
+            return f"host-{ip}"
+
+        detector.check_reachable = fake_check
+        detector.reverse_lookup = fake_lookup
+
+        results = await detector.scan_unreachable_sources(
+            ["10.0.0.1", "8.8.8.8", "10.0.0.3"], target_server=None
+        )
+
+        results.sort(key=lambda r: r["source_ip"])
+        assert [r["source_ip"] for r in results] == ["10.0.0.3", "8.8.8.8"]
+        assert results[1] == {
+            "source_ip": "8.8.8.8",
+            "reverse_dns": "host-8.8.8.8",
+            "severity": "low",
+            "is_private": False,
+        }
+        assert results[0]["is_private"] is True
+
+    @pytest.mark.asyncio
+    async def test_empty_input(self):
+        detector = UnreachableDetector(SSHConnectionPool())
+        assert await detector.scan_unreachable_sources([], target_server=None) == []
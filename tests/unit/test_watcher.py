@@ -0,0 +1,78 @@
+"""Tests for the real-time log watcher."""
+
+import pytest
+
+from keyspider.core.watcher import LogWatcher
+
+ACCEPTED = "Jan  5 14:23:01 web01 sshd[12345]: Accepted publickey for root from 10.0.1.50 port 52222 ssh2\n"
+FAILED = "Jan  5 14:24:10 web01 sshd[12347]: Failed password for root from 192.168.1.100 port 39281 ssh2\n"
+
+
+class _FakeStdout:
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+
+    async def read(self, n):
+        return self._chunks.pop(0) if self._chunks else ""
+
+
+class _FakeProcess:
+    def __init__(self, chunks):
+        self.stdout = _FakeStdout(chunks)
+
+
+class _FakeConn:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def create_process(self, command):
+        return _FakeProcess(self._chunks)
+
+
+async def _tail(monkeypatch, watcher, chunks):
+    async def fake_connect(*args, **kwargs):
+        return _FakeConn(chunks)
+
+    monkeypatch.setattr("keyspider.core.watcher.asyncssh.connect", fake_connect)
+    watcher._running = True
+    await watcher._connect_and_tail()
+
+
+class TestConnectAndTail:
+    @pytest.mark.asyncio
+    async def test_reassembles_lines_split_across_reads(self, monkeypatch):
+        watcher = LogWatcher("web01")
+        batches = []
+        watcher.on_events(batches.append)
+
+        chunks = [ACCEPTED + FAILED[:30], FAILED[30:] + "\nnot a log line\n"]
+        await _tail(monkeypatch, watcher, chunks)
+
+        assert [len(b) for b in batches] == [1, 1]
+        assert batches[0][0].event_type == "accepted"
+        assert batches[1][0].source_ip == "192.168.1.100"
+
+    @pytest.mark.asyncio
+    async def test_per_event_callbacks_still_called(self, monkeypatch):
+        watcher = LogWatcher("web01")
+        events = []
+        watcher.on_event(events.append)
+
+        await _tail(monkeypatch, watcher, [ACCEPTED + FAILED])
+
+        assert [e.source_ip for e in events] == ["10.0.1.50", "192.168.1.100"]
+
+    @pytest.mark.asyncio
+    async def test_callback_error_does_not_stop_dispatch(self, monkeypatch):
+        watcher = LogWatcher("web01")
+        seen = []
+
+        def broken(batch):
+            raise RuntimeError("boom")
+
+        watcher.on_events(broken)
+        watcher.on_events(seen.append)
+
+        await _tail(monkeypatch, watcher, [ACCEPTED])
+
+        assert len(seen) == 1